@@ -7,27 +7,80 @@ correctly with single-line CSV files and various formats.
 """
 
 import csv
+import ipaddress
+import itertools
 import re
-from typing import List, Tuple, Optional, Callable
+from typing import Iterator, List, Tuple, Optional, Callable
+
+
+# Buffer size for sequential CSV reads
+_BUFSIZE = 256 * 1024
+
+_MAC_RE = re.compile(r'^[0-9a-fA-F]{2}([:-])[0-9a-fA-F]{2}(\1[0-9a-fA-F]{2}){4}$')
 
 
 def is_mac_address(value: str) -> bool:
     """Check if value looks like a MAC address."""
-    mac_pattern = r'^[0-9a-fA-F]{2}([:-])[0-9a-fA-F]{2}(\1[0-9a-fA-F]{2}){4}$'
-    return bool(re.match(mac_pattern, value))
+    return bool(_MAC_RE.match(value))
 
 
 def is_ip_address(value: str) -> bool:
     """Check if value looks like an IPv4 address."""
-    parts = value.split('.')
-    if len(parts) != 4:
-        return False
     try:
-        return all(0 <= int(p) <= 255 for p in parts)
-    except (ValueError, TypeError):
+        ipaddress.IPv4Address(value)
+        return True
+    except ValueError:
         return False
 
 
+def _is_header_row(
+    first_row: List[str],
+    expected_columns: int,
+    validator: Optional[Callable[[List[str]], bool]] = None,
+    column_names: Optional[List[str]] = None
+) -> bool:
+    """Decide whether the first row of a CSV file is a header row."""
+    try:
+        if len(first_row) >= expected_columns:
+            # Check if validator says this looks like data
+            if validator and validator(first_row):
+                return False
+            # Check if column names match expected header keywords
+            if column_names:
+                first_row_lower = [col.lower().strip() for col in first_row]
+                return any(name.lower() in first_row_lower for name in column_names)
+    except Exception:
+        # If validation fails, assume no header
+        pass
+    return False
+
+
+def _read_data_rows(
+    f,
+    expected_columns: int,
+    validator: Optional[Callable[[List[str]], bool]] = None,
+    column_names: Optional[List[str]] = None
+) -> Tuple[bool, Iterator[List[str]]]:
+    """
+    Detect the header of an open CSV file and return (has_header, data_rows).
+    
+    The file is read in a single pass: the first row is inspected as it is
+    read and, unless it is a header, handed back ahead of the remaining rows.
+    Empty lines are skipped.
+    
+    Raises:
+        ValueError: If file is empty
+    """
+    reader = csv.reader(f)
+    first_row = next(reader, None)
+    if not first_row or all(not cell.strip() for cell in first_row):
+        raise ValueError("CSV file is empty")
+    
+    has_header = _is_header_row(first_row, expected_columns, validator, column_names)
+    rows = reader if has_header else itertools.chain([first_row], reader)
+    return has_header, (row for row in rows if row and any(cell.strip() for cell in row))
+
+
 def parse_csv_with_smart_header_detection(
     file_path: str,
     expected_columns: int,
@@ -52,53 +105,9 @@ def parse_csv_with_smart_header_detection(
     Raises:
         ValueError: If file is empty or has no valid records
     """
-    with open(file_path, 'r') as f:
-        # Read the first line to check if it's a header
-        first_line = f.readline().strip()
-        if not first_line:
-            raise ValueError("CSV file is empty")
-        
-        f.seek(0)
-        
-        # Determine if there's a header
-        has_header = False
-        
-        try:
-            # Parse the first line
-            first_row = next(csv.reader([first_line]))
-            
-            if len(first_row) >= expected_columns:
-                # Check if validator says this looks like data
-                if validator and validator(first_row):
-                    has_header = False
-                # Check if column names match expected header keywords
-                elif column_names:
-                    first_row_lower = [col.lower().strip() for col in first_row]
-                    has_header = any(name.lower() in first_row_lower for name in column_names)
-                else:
-                    # Fall back to CSV Sniffer for multi-line files
-                    sample = f.read(1024)
-                    f.seek(0)
-                    try:
-                        has_header = csv.Sniffer().has_header(sample)
-                    except Exception:
-                        # If sniffer fails, assume no header
-                        has_header = False
-        except Exception:
-            # If parsing fails, assume no header
-            has_header = False
-        
-        # Read all records
-        reader = csv.reader(f)
-        if has_header:
-            next(reader, None)
-        
-        records = []
-        for row in reader:
-            # Skip empty lines
-            if not row or all(not cell.strip() for cell in row):
-                continue
-            records.append(row)
+    with open(file_path, 'r', newline='', buffering=_BUFSIZE) as f:
+        has_header, rows = _read_data_rows(f, expected_columns, validator, column_names)
+        records = list(rows)
     
     if not records:
         raise ValueError("No valid records found in CSV file")
@@ -106,6 +115,86 @@ def parse_csv_with_smart_header_detection(
     return records, has_header
 
 
+def _looks_like_mac_ip_data(row: List[str]) -> bool:
+    """Check if row looks like data (has MAC and IP patterns)."""
+    if len(row) < 3:
+        return False
+    return is_mac_address(row[1].strip()) and is_ip_address(row[2].strip())
+
+
+def _validate_mac_ip_row(
+    row: List[str],
+    mac_validator: Optional[Callable[[str], Optional[str]]] = None,
+    ip_validator: Optional[Callable[[str], bool]] = None
+) -> Tuple[Optional[Tuple[str, str, str]], Optional[str]]:
+    """
+    Validate a single hostname, mac, ip row.
+    
+    Returns:
+        Tuple of (record, warning); exactly one of them is None
+    """
+    if len(row) < 3:
+        return None, "expected 'hostname,mac,ip'"
+    
+    hostname = row[0].strip()
+    mac = row[1].strip()
+    ip = row[2].strip()
+    
+    # Validate MAC address
+    if mac_validator:
+        mac = mac_validator(mac)
+        if not mac:
+            return None, "invalid MAC address"
+    
+    # Validate IP address
+    if ip_validator and not ip_validator(ip):
+        return None, "invalid IP address"
+    
+    if not hostname:
+        return None, "empty hostname"
+    
+    return (hostname, mac, ip), None
+
+
+def iter_mac_ip_csv(
+    file_path: str,
+    mac_validator: Optional[Callable[[str], Optional[str]]] = None,
+    ip_validator: Optional[Callable[[str], bool]] = None
+) -> Iterator[Tuple[str, str, str]]:
+    """
+    Stream validated records from a CSV file with format: hostname, mac, ip.
+    
+    Rows are read and validated one at a time, so memory use does not grow
+    with the size of the file. Arguments are the same as parse_mac_ip_csv.
+    
+    Yields:
+        Tuples (hostname, mac, ip)
+        
+    Raises:
+        ValueError: If the file is empty or no valid records are found
+    """
+    seen = False
+    with open(file_path, 'r', newline='', buffering=_BUFSIZE) as f:
+        _has_header, rows = _read_data_rows(
+            f,
+            expected_columns=3,
+            validator=_looks_like_mac_ip_data,
+            column_names=['hostname', 'mac', 'ip', 'address']
+        )
+        
+        for idx, row in enumerate(rows, start=1):
+            record, warning = _validate_mac_ip_row(row, mac_validator, ip_validator)
+            if warning:
+                print(f"WARNING: CSV line {idx}: {warning} - skipping")
+                continue
+            
+            seen = True
+            yield record
+    
+    if not seen:
+        raise ValueError("No valid records found in CSV file")
+
+
 def parse_mac_ip_csv(
     file_path: str,
     mac_validator: Optional[Callable[[str], Optional[str]]] = None,
@@ -115,6 +204,7 @@ def parse_mac_ip_csv(
     Parse CSV file with format: hostname, mac, ip.
     
     Uses smart header detection that works correctly with single-line CSV files.
+    Callers that only iterate once should prefer iter_mac_ip_csv.
     
     Args:
         file_path: Path to CSV file
@@ -127,52 +217,7 @@ def parse_mac_ip_csv(
     Raises:
         ValueError: If no valid records found
     """
-    def looks_like_data(row: List[str]) -> bool:
-        """Check if row looks like data (has MAC and IP patterns)."""
-        if len(row) < 3:
-            return False
-        return is_mac_address(row[1].strip()) and is_ip_address(row[2].strip())
-    
-    raw_records, _ = parse_csv_with_smart_header_detection(
-        file_path=file_path,
-        expected_columns=3,
-        validator=looks_like_data,
-        column_names=['hostname', 'mac', 'ip', 'address']
-    )
-    
-    # Process and validate records
-    validated_records = []
-    for idx, row in enumerate(raw_records, start=1):
-        if len(row) < 3:
-            print(f"WARNING: CSV line {idx}: expected 'hostname,mac,ip' - skipping")
-            continue
-        
-        hostname = row[0].strip()
-        mac = row[1].strip()
-        ip = row[2].strip()
-        
-        # Validate MAC address
-        if mac_validator:
-            mac = mac_validator(mac)
-            if not mac:
-                print(f"WARNING: CSV line {idx}: invalid MAC address - skipping")
-                continue
-        
-        # Validate IP address
-        if ip_validator and not ip_validator(ip):
-            print(f"WARNING: CSV line {idx}: invalid IP address - skipping")
-            continue
-        
-        if not hostname:
-            print(f"WARNING: CSV line {idx}: empty hostname - skipping")
-            continue
-        
-        validated_records.append((hostname, mac, ip))
-    
-    if not validated_records:
-        raise ValueError("No valid records found in CSV file")
-    
-    return validated_records
+    return list(iter_mac_ip_csv(file_path, mac_validator, ip_validator))
 
 
 def parse_hostname_serial_csv(file_path: str) -> List[Tuple[str, str, Optional[str]]]:
@@ -19,88 +19,125 @@ Notes:
 """
 
 import argparse
+import contextlib
 import csv
 import datetime
+import functools
+import hashlib
+import itertools
+import json
+import mmap
 import os
 import re
 import shutil
+import socket
+import stat
 import subprocess
 import sys
-from typing import List, Optional, Tuple
+import tempfile
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
 
 DEFAULT_RELATIVE_DHCPD_CONF = os.path.join('..', 'ansible', 'roles', 'dhcpd', 'files', 'dhcpd.conf')
 
+# Buffer size for sequential config/CSV reads and writes
+_BUFSIZE = 256 * 1024
+
+# Install locations checked when dhcpd is not in PATH
+_DHCPD_PATHS = (
+    '/usr/sbin/dhcpd',
+    '/usr/local/sbin/dhcpd',
+    '/opt/homebrew/sbin/dhcpd',
+)
+
+# Column names that mark the first CSV row as a header
+_CSV_HEADER_NAMES = frozenset(('hostname', 'mac', 'ip', 'address'))
+
+# Lookup tables for regex-free MAC validation (normalized form aa:bb:cc:dd:ee:ff)
+_HEX = frozenset('0123456789abcdef')
+_COLONS = (2, 5, 8, 11, 14)
+
+# Reservation block layout (consistent two-space indentation inside block)
+_BLOCK_TEMPLATE = (
+    "host {fqdn} {{\n"
+    "  hardware ethernet {mac};\n"
+    "  fixed-address {ip};\n"
+    "}}\n"
+)
+
+# Keywords for _scan_blocks: host, hardware ethernet, fixed-address. dhcpd
+# matches them case-insensitively and allows any whitespace between words
+_SCAN_KEYWORDS = (r'host', r'hardware\s+ethernet', r'fixed-address')
+_SCAN_PATTERNS = tuple(re.compile(keyword, re.IGNORECASE) for keyword in _SCAN_KEYWORDS)
+_SCAN_BYTES_PATTERNS = tuple(re.compile(keyword.encode('ascii'), re.IGNORECASE)
+                             for keyword in _SCAN_KEYWORDS)
+
+# Tokens for _scan_blocks: braces, separators, comments and the characters
+# allowed in a MAC / IP value, for str and bytes content
+_SCAN_TOKENS = ('{', '}', ';', '\n', '#', '{};', '0123456789abcdefABCDEF:', '0123456789.')
+_SCAN_BYTES_TOKENS = tuple(token.encode('ascii') for token in _SCAN_TOKENS)
+
+# include statements pull in files the validation cache cannot fingerprint
+_INCLUDE_RE = re.compile(rb'^[ \t]*include\s', re.MULTILINE | re.IGNORECASE)
+
 
 def validate_ip_address(ip: str) -> bool:
-    parts = ip.split('.')
-    if len(parts) != 4:
+    # inet_aton also accepts shorthand ("10.1") and hex/octal forms, so
+    # require a plain dotted quad before handing it over
+    if ip.count('.') != 3 or not ip.replace('.', '').isdigit():
         return False
     try:
-        return all(0 <= int(p) <= 255 for p in parts)
-    except (ValueError, TypeError):
+        socket.inet_aton(ip)
+        return True
+    except (OSError, ValueError):
         return False
 
 
+@functools.lru_cache(maxsize=4096)
 def normalize_mac(mac: str) -> Optional[str]:
-    mac = mac.strip().lower().replace('-', ':')
-    if not re.fullmatch(r"[0-9a-f]{2}(:[0-9a-f]{2}){5}", mac):
+    s = mac.strip().lower().replace('-', ':')
+    if len(s) != 17:
+        return None
+    if any(s[i] != ':' for i in _COLONS):
         return None
-    return mac
+    nibbles = s[0:2] + s[3:5] + s[6:8] + s[9:11] + s[12:14] + s[15:17]
+    if not all(c in _HEX for c in nibbles):
+        return None
+    return s
+
+
+def qualify_hostname(hostname: str, domain: Optional[str]) -> str:
+    """Append domain to hostname unless it is already qualified with it."""
+    if not domain or hostname.endswith('.' + domain):
+        return hostname
+    return f"{hostname}.{domain}"
 
 
 def build_reservation_block(hostname: str, mac: str, ip: str, domain: Optional[str]) -> str:
-    fqdn = f"{hostname}.{domain}" if domain and not hostname.endswith(f".{domain}") else hostname
-    # Preserve consistent two-space indentation inside block
-    return (
-        f"host {fqdn} {{\n"
-        f"  hardware ethernet {mac};\n"
-        f"  fixed-address {ip};\n"
-        f"}}\n"
-    )
+    return _BLOCK_TEMPLATE.format(fqdn=qualify_hostname(hostname, domain), mac=mac, ip=ip)
 
 
-def parse_csv(file_path: str) -> List[Tuple[str, str, str]]:
-    records: List[Tuple[str, str, str]] = []
-    with open(file_path, 'r') as f:
-        # Read the first line to check if it's a header
-        first_line = f.readline().strip()
-        f.seek(0)
+def _iter_parse_csv(file_path: str) -> Iterator[Tuple[str, str, str]]:
+    """Stream validated (hostname, mac, ip) records from a CSV file."""
+    seen = False
+    with open(file_path, 'r', buffering=_BUFSIZE) as f:
+        # Parse in a single pass: inspect the first row, then keep reading
+        reader = csv.reader(f)
+        first_row = next(reader, None)
         
         # Determine if there's a header by checking if the first line looks like data
         has_header = False
-        if first_line:
-            # Try to parse the first line as CSV
-            try:
-                first_row = next(csv.reader([first_line]))
-                if len(first_row) >= 3:
-                    # Check if it looks like data (has MAC and IP patterns) or a header
-                    potential_mac = first_row[1].strip()
-                    potential_ip = first_row[2].strip()
-                    
-                    # If the second column looks like a MAC and third like an IP, it's data
-                    if normalize_mac(potential_mac) and validate_ip_address(potential_ip):
-                        has_header = False
-                    else:
-                        # Otherwise, try the CSV sniffer
-                        sample = f.read(1024)
-                        f.seek(0)
-                        has_header = csv.Sniffer().has_header(sample)
-            except Exception:
-                # If parsing fails, fall back to sniffer
-                sample = f.read(1024)
-                f.seek(0)
-                try:
-                    has_header = csv.Sniffer().has_header(sample)
-                except Exception:
-                    # If sniffer also fails, assume no header
-                    has_header = False
+        if first_row and len(first_row) >= 3:
+            # If the second column looks like a MAC and third like an IP, it's data;
+            # otherwise it's a header only if it names the expected columns
+            potential_mac = first_row[1].strip()
+            potential_ip = first_row[2].strip()
+            if not (normalize_mac(potential_mac) and validate_ip_address(potential_ip)):
+                has_header = any(cell.strip().lower() in _CSV_HEADER_NAMES for cell in first_row)
         
-        reader = csv.reader(f)
-        if has_header:
-            next(reader, None)
+        rows = reader if has_header or first_row is None else itertools.chain([first_row], reader)
         
-        for idx, row in enumerate(reader, start=2 if has_header else 1):
+        for idx, row in enumerate(rows, start=2 if has_header else 1):
             # Unified format: hostname (FQDN), mac, ip
             if not row or len(row) < 3:
                 print(f"WARNING: CSV line {idx}: expected 'hostname,mac,ip' - skipping")
@@ -110,29 +147,84 @@ def parse_csv(file_path: str) -> List[Tuple[str, str, str]]:
             if not hostname or not norm_mac or not validate_ip_address(ip):
                 print(f"WARNING: CSV line {idx}: invalid hostname/mac/ip - skipping")
                 continue
-            records.append((hostname, norm_mac, ip))
-    if not records:
+            seen = True
+            yield hostname, norm_mac, ip
+    if not seen:
         raise ValueError("No valid records found in CSV file")
-    return records
 
 
 def load_config_text(config_path: str) -> str:
-    with open(config_path, 'r') as f:
+    with open(config_path, 'r', buffering=_BUFSIZE) as f:
         return f.read()
 
 
+@contextlib.contextmanager
+def open_config_mmap(config_path: str) -> Iterator[Union[bytes, mmap.mmap]]:
+    """Map dhcpd.conf read-only for zero-copy scanning (empty files yield b'')."""
+    with open(config_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield data
+
+
 def save_config_text(config_path: str, content: str) -> None:
-    with open(config_path, 'w') as f:
-        f.write(content)
+    """
+    Write the config to a temporary file and atomically swap it into place.
+    
+    Replacing the file (instead of truncating it) leaves any hardlinked
+    backup of the previous version untouched. A symlinked config is resolved
+    first so the link survives, and the new file keeps the owner, group and
+    mode of the old one so dhcpd can still read it.
+    """
+    real_path = os.path.realpath(config_path)
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(real_path)}.", suffix='.tmp',
+                                        dir=os.path.dirname(real_path))
+        with os.fdopen(fd, 'w', buffering=_BUFSIZE) as f:
+            try:
+                st = os.stat(real_path)
+            except FileNotFoundError:
+                os.fchmod(f.fileno(), 0o644)
+            else:
+                # chown first: it may clear setuid/setgid bits set by chmod
+                if (st.st_uid, st.st_gid) != (os.geteuid(), os.getegid()):
+                    os.fchown(f.fileno(), st.st_uid, st.st_gid)
+                os.fchmod(f.fileno(), stat.S_IMODE(st.st_mode))
+            f.write(content)
+        os.replace(tmp_path, real_path)
+    except BaseException:
+        if tmp_path:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+        raise
 
 
 def make_backup(config_path: str) -> str:
     ts = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
     backup_path = f"{config_path}.{ts}.bak"
-    shutil.copy2(config_path, backup_path)
+    try:
+        # Zero-copy backup; save_config_text never modifies the linked inode.
+        # link() does not follow symlinks, so link the real file
+        os.link(os.path.realpath(config_path), backup_path)
+    except OSError:
+        # Cross-device, unsupported filesystem or existing backup name
+        shutil.copy2(config_path, backup_path)
     return backup_path
 
 
+def _find_dhcpd_binary() -> Optional[str]:
+    """Look for dhcpd in PATH first, then in the usual install locations."""
+    dhcpd_binary = shutil.which('dhcpd')
+    if not dhcpd_binary:
+        for path in _DHCPD_PATHS:
+            if os.path.isfile(path) and os.access(path, os.X_OK):
+                return path
+    return dhcpd_binary
+
+
 def validate_dhcpd_syntax(config_path: str, verbose: bool = False) -> Tuple[bool, str]:
     """
     Validate dhcpd.conf syntax using dhcpd -t command.
@@ -147,34 +239,7 @@ def validate_dhcpd_syntax(config_path: str, verbose: bool = False) -> Tuple[bool
         error_message contains the error details if validation fails
     """
     try:
-        # Try to find dhcpd binary
-        dhcpd_paths = [
-            '/usr/sbin/dhcpd',
-            '/usr/local/sbin/dhcpd',
-            '/opt/homebrew/sbin/dhcpd',
-            'dhcpd'  # Fallback to PATH
-        ]
-        
-        dhcpd_binary = None
-        for path in dhcpd_paths:
-            if os.path.isfile(path) and os.access(path, os.X_OK):
-                dhcpd_binary = path
-                break
-        
-        if not dhcpd_binary:
-            # Try to find in PATH
-            try:
-                result = subprocess.run(
-                    ['which', 'dhcpd'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                if result.returncode == 0 and result.stdout.strip():
-                    dhcpd_binary = result.stdout.strip()
-            except:
-                pass
-        
+        dhcpd_binary = _find_dhcpd_binary()
         if not dhcpd_binary:
             # Cannot find dhcpd, skip validation with warning
             warning = "WARNING: dhcpd binary not found, skipping syntax validation"
@@ -222,6 +287,73 @@ def validate_dhcpd_syntax(config_path: str, verbose: bool = False) -> Tuple[bool
         return False, error
 
 
+def _validate_cache_path() -> str:
+    """Per-user file recording the last dhcpd.conf that passed dhcpd -t."""
+    # Kept in the user's own cache directory so no other user can plant a result
+    cache_dir = os.path.join(
+        os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+        'dhcp_reservation_manager'
+    )
+    os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+    return os.path.join(cache_dir, 'validate.json')
+
+
+def _config_fingerprint(config_path: str) -> Optional[Dict[str, object]]:
+    """
+    Identify a config and the dhcpd binary that checks it.
+    
+    Returns None if a validation result must not be cached: when dhcpd is
+    missing, or when the config includes other files, whose contents are
+    not part of the fingerprint.
+    """
+    with open(config_path, 'rb', buffering=_BUFSIZE) as f:
+        data = f.read()
+    dhcpd_binary = _find_dhcpd_binary()
+    if not dhcpd_binary or _INCLUDE_RE.search(data):
+        return None
+    binary_stat = os.stat(dhcpd_binary)
+    return {
+        'path': os.path.abspath(config_path),
+        'sha256': hashlib.sha256(data).hexdigest(),
+        'dhcpd': [os.path.realpath(dhcpd_binary), binary_stat.st_mtime_ns, binary_stat.st_size],
+    }
+
+
+def is_validation_cached(config_path: str) -> bool:
+    """Return True if config_path is unchanged since it last passed validation."""
+    try:
+        with open(_validate_cache_path(), 'r') as f:
+            cached = json.load(f)
+        current = _config_fingerprint(config_path)
+    except (OSError, ValueError):
+        return False
+    return (
+        current is not None
+        and cached.get('valid') is True
+        and all(cached.get(key) == value for key, value in current.items())
+    )
+
+
+def record_validation(config_path: str) -> None:
+    """Remember that config_path passed validation (best effort)."""
+    tmp_path = None
+    try:
+        entry = _config_fingerprint(config_path)
+        if entry is None:
+            return
+        entry['valid'] = True
+        cache_path = _validate_cache_path()
+        # mkstemp creates the file 0600; os.replace swaps it in atomically
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        if tmp_path:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+
+
 def restore_from_backup(config_path: str, backup_path: str) -> bool:
     """Restore configuration from backup file."""
     try:
@@ -232,13 +364,94 @@ def restore_from_backup(config_path: str, backup_path: str) -> bool:
         return False
 
 
-def find_reservation_block(content: str, hostname_or_fqdn: str) -> Tuple[int, int]:
-    """Find the start and end indices of a reservation block for the given host."""
-    pattern = re.compile(rf"(^|\n)(host\s+{re.escape(hostname_or_fqdn)}\s*\{{[\s\S]*?\n\}})\n", re.MULTILINE)
-    match = pattern.search(content)
+def find_reservation_block(content: str, hostname_or_fqdn: str,
+                           index: Optional[Dict[str, Tuple[int, int]]] = None) -> Tuple[int, int]:
+    """
+    Find the start and end indices of a reservation block for the given host.
+    
+    If index (hostname -> span, as built by ConfDraft) is given, it is used
+    instead of searching content.
+    """
+    if index is not None:
+        return index.get(hostname_or_fqdn, (-1, -1))
+    for hostname, _mac, _ip, start, end in _scan_blocks(content):
+        if hostname == hostname_or_fqdn:
+            return start, end
+    return -1, -1
+
+
+def _statement_value(content, keyword, lo: int, hi: int, semi):
+    """Return the stripped value of '<keyword> <value>;' within content[lo:hi], or None."""
+    match = keyword.search(content, lo, hi)
     if not match:
-        return -1, -1
-    return match.start(2), match.end(0)
+        return None
+    j = content.find(semi, match.end(), hi)
+    if j == -1:
+        return None
+    return content[match.end():j].strip()
+
+
+def _scan_blocks(
+    content: Union[str, bytes, mmap.mmap]
+) -> Iterator[Tuple[str, Optional[str], Optional[str], int, int]]:
+    """
+    Walk dhcpd.conf content once and yield (hostname, mac, ip, start, end)
+    for every host block. mac/ip are None unless the block has a valid
+    hardware ethernet / fixed-address statement.
+    
+    Only find(), precompiled keyword searches and slicing are used, so this
+    is linear in the size of the content and works on str, bytes or an mmap
+    alike. Fields are returned as str; end includes the newline after the
+    closing brace, if any.
+    """
+    is_text = isinstance(content, str)
+    host, hardware, fixed = _SCAN_PATTERNS if is_text else _SCAN_BYTES_PATTERNS
+    (lbrace, rbrace, semi, newline, comment, delimiters,
+     mac_chars, ip_chars) = _SCAN_TOKENS if is_text else _SCAN_BYTES_TOKENS
+    
+    pos = 0
+    while True:
+        match = host.search(content, pos)
+        if not match:
+            return
+        start, pos = match.span()
+        
+        # 'host' must be a keyword of its own, followed by one name and '{'
+        before = content[start - 1:start]
+        if before and not (before.isspace() or before in delimiters):
+            continue
+        if not content[pos:pos + 1].isspace():
+            continue
+        if content.find(comment, content.rfind(newline, 0, start) + 1, start) != -1:
+            continue
+        brace = content.find(lbrace, pos)
+        if brace == -1:
+            return
+        name = content[pos:brace].split()
+        if len(name) != 1:
+            continue
+        close = content.find(rbrace, brace)
+        if close == -1:
+            return
+        
+        end = close + 1
+        if content[end:end + 1] == newline:
+            end += 1
+        pos = end
+        
+        hostname = name[0]
+        mac = _statement_value(content, hardware, brace, close, semi)
+        ip = _statement_value(content, fixed, brace, close, semi)
+        if not mac or mac.strip(mac_chars):
+            mac = None
+        if not ip or ip.strip(ip_chars):
+            ip = None
+        
+        if not is_text:
+            hostname = hostname.decode('utf-8')
+            mac = mac.decode('ascii') if mac else None
+            ip = ip.decode('ascii') if ip else None
+        yield hostname, mac.lower() if mac else None, ip, start, end
 
 
 def find_reservation_by_mac(content: str, mac: str) -> Optional[Tuple[str, str, str]]:
@@ -247,54 +460,137 @@ def find_reservation_by_mac(content: str, mac: str) -> Optional[Tuple[str, str,
     if not norm_mac:
         return None
     
-    pattern = re.compile(
-        r"host\s+(\S+)\s*\{[^\}]*?hardware\s+ethernet\s+([0-9a-f:]+)\s*;[^\}]*?fixed-address\s+([\d.]+)\s*;[^\}]*?\}",
-        re.MULTILINE | re.IGNORECASE | re.DOTALL
-    )
-    
-    for match in pattern.finditer(content):
-        found_hostname = match.group(1)
-        found_mac = match.group(2).lower()
-        found_ip = match.group(3)
-        
-        if found_mac == norm_mac:
+    for found_hostname, found_mac, found_ip, _start, _end in _scan_blocks(content):
+        if found_mac == norm_mac and found_ip:
             return (found_hostname, found_mac, found_ip)
     
     return None
 
 
-def extract_all_reservations(content: str) -> List[Tuple[str, str, str]]:
-    """Extract all DHCP reservations from dhcpd.conf content."""
-    reservations: List[Tuple[str, str, str]] = []
+def extract_all_reservations(content: Union[str, bytes, mmap.mmap]) -> List[Tuple[str, str, str]]:
+    """
+    Extract all DHCP reservations from dhcpd.conf content.
     
-    pattern = re.compile(
-        r"host\s+(\S+)\s*\{[^\}]*?hardware\s+ethernet\s+([0-9a-f:]+)\s*;[^\}]*?fixed-address\s+([\d.]+)\s*;[^\}]*?\}",
-        re.MULTILINE | re.IGNORECASE | re.DOTALL
-    )
+    content may also be bytes or an mmap (see open_config_mmap).
+    """
+    return [(hostname, mac, ip) for hostname, mac, ip, _start, _end in _scan_blocks(content) if mac and ip]
+
+
+class ConfDraft:
+    """
+    Pending reservation edits against the original dhcpd.conf content.
+    
+    Replacements and removals are recorded against block spans in the
+    original text and new blocks are queued for the end of the file, so
+    each edit is O(1) and the result is assembled once by render().
+    A MAC index of the draft's current state is kept in sync with edits,
+    and host blocks are located through a name index built in the same pass.
+    """
+    
+    def __init__(self, content: str):
+        self.content = content
+        self.macs: Dict[str, Tuple[str, str]] = {}  # mac -> (hostname, ip)
+        self._spans: Dict[str, Tuple[int, int]] = {}  # hostname -> (start, end) in content
+        for hostname, mac, ip, start, end in _scan_blocks(content):
+            # Keep the first block for a name/MAC, like the regex lookups did
+            self._spans.setdefault(hostname, (start, end))
+            if mac and ip:
+                self.macs.setdefault(mac, (hostname, ip))
+        self._names: Dict[str, str] = {hostname: mac for mac, (hostname, _ip) in self.macs.items()}
+        self._edits: Dict[int, Tuple[int, str]] = {}  # start -> (end, replacement)
+        self._appended: Dict[str, str] = {}  # fqdn -> block
+    
+    def lookup_mac(self, mac: str) -> Optional[Tuple[str, str]]:
+        """Return (hostname, ip) of the reservation currently holding mac."""
+        return self.macs.get(mac)
+    
+    def has_reservation(self, fqdn: str, mac: str, ip: str) -> bool:
+        """Return True if exactly this (fqdn, mac, ip) reservation is present."""
+        return self.macs.get(mac) == (fqdn, ip)
     
-    for match in pattern.finditer(content):
-        hostname = match.group(1)
-        mac = match.group(2).lower()
-        ip = match.group(3)
-        reservations.append((hostname, mac, ip))
+    def _forget(self, fqdn: str) -> None:
+        mac = self._names.pop(fqdn, None)
+        if mac and self.macs.get(mac, ('',))[0] == fqdn:
+            del self.macs[mac]
+    
+    def set_block(self, fqdn: str, mac: str, ip: str, block: str) -> bool:
+        """Replace the host's block in place, or queue it for append. Returns True if changed."""
+        self._forget(fqdn)
+        self.macs[mac] = (fqdn, ip)
+        self._names[fqdn] = mac
+        
+        if fqdn not in self._appended:
+            start, end = find_reservation_block(self.content, fqdn, self._spans)
+            _end, old = self._edits.get(start, (end, self.content[start:end]))
+            # A removed block stays removed; re-adding the host appends it
+            if start != -1 and old:
+                self._edits[start] = (end, block)
+                return old != block
+        
+        old = self._appended.get(fqdn)
+        self._appended[fqdn] = block
+        return old != block
+    
+    def remove_block(self, fqdn: str) -> bool:
+        """Remove the host's block. Returns True if a block was removed."""
+        if self._appended.pop(fqdn, None) is None:
+            start, end = find_reservation_block(self.content, fqdn, self._spans)
+            if start == -1 or self._edits.get(start, (end, None))[1] == '':
+                return False
+            self._edits[start] = (end, '')
+        
+        self._forget(fqdn)
+        return True
     
-    return reservations
+    def render(self) -> str:
+        """Assemble the edited configuration text."""
+        parts: List[str] = []
+        pos = 0
+        for start in sorted(self._edits):
+            end, replacement = self._edits[start]
+            parts.append(self.content[pos:start])
+            parts.append(replacement)
+            pos = end
+        parts.append(self.content[pos:])
+        
+        # Append new blocks with a separating newline if needed
+        body = ''.join(parts)
+        if self._appended and body and not body.endswith('\n'):
+            body += '\n'
+        return body + ''.join(self._appended.values())
+
+
+def _is_plain_csv_field(value: str) -> bool:
+    """Check if value can be written to CSV as-is (csv.writer would not quote it)."""
+    return not (',' in value or '"' in value or '\r' in value or '\n' in value)
 
 
 def write_csv(records: List[Tuple[str, str, str]], output_path: Optional[str], include_header: bool = True) -> None:
-    """Write reservations to CSV file."""
-    import sys
-    
-    output_file = open(output_path, 'w', newline='') if output_path else sys.stdout
+    """Write reservations to CSV file (or stdout if output_path is not set)."""
+    output_file = open(output_path, 'w', newline='', buffering=_BUFSIZE) if output_path else sys.stdout
     
     try:
-        writer = csv.writer(output_file)
-        
-        if include_header:
-            writer.writerow(['hostname', 'mac', 'ip'])
-        
-        for hostname, mac, ip in records:
-            writer.writerow([hostname, mac, ip])
+        if all(_is_plain_csv_field(field) for record in records for field in record):
+            # Nothing needs quoting: build the CSV text directly and write it once
+            lines = ['hostname,mac,ip'] if include_header else []
+            lines.extend(f"{hostname},{mac},{ip}" for hostname, mac, ip in records)
+            if lines:
+                text = '\r\n'.join(lines) + '\r\n'
+                stdout_buffer = getattr(sys.stdout, 'buffer', None) if not output_path else None
+                if stdout_buffer is not None:
+                    # Skip the text layer: one pre-encoded write to the binary stream
+                    sys.stdout.flush()
+                    stdout_buffer.write(text.encode(sys.stdout.encoding or 'utf-8'))
+                    stdout_buffer.flush()
+                else:
+                    output_file.write(text)
+        else:
+            writer = csv.writer(output_file)
+            
+            if include_header:
+                writer.writerow(['hostname', 'mac', 'ip'])
+            
+            writer.writerows(records)
         
         if output_path:
             print(f"Exported {len(records)} reservation(s) to: {output_path}")
@@ -319,21 +615,21 @@ def get_user_confirmation(prompt: str) -> bool:
             return False
 
 
-def add_reservation(content: str, hostname: str, mac: str, ip: str, domain: Optional[str], 
-                   interactive: bool = True) -> Tuple[str, bool, Optional[str]]:
-    """Add or update a DHCP reservation."""
-    fqdn = f"{hostname}.{domain}" if domain and not hostname.endswith(f".{domain}") else hostname
+def add_reservation(draft: ConfDraft, hostname: str, mac: str, ip: str, domain: Optional[str],
+                    interactive: bool = True) -> Tuple[bool, Optional[str]]:
+    """Add or update a DHCP reservation. Returns (changed, error)."""
+    fqdn = qualify_hostname(hostname, domain)
+    
+    # Exact match (no change needed): the common case when re-running a batch
+    if draft.has_reservation(fqdn, mac, ip):
+        print(f"Reservation for {fqdn} -> {mac} -> {ip} already exists, skipping")
+        return False, None
     
     # Check if this MAC is already assigned
-    existing = find_reservation_by_mac(content, mac)
+    existing = draft.lookup_mac(mac)
     
     if existing:
-        existing_hostname, existing_mac, existing_ip = existing
-        
-        # Check if this is an exact match (no change needed)
-        if existing_hostname == fqdn and existing_ip == ip:
-            print(f"Reservation for {fqdn} -> {mac} -> {ip} already exists, skipping")
-            return content, False, None
+        existing_hostname, existing_ip = existing
         
         # Check if this is an update to the same host
         if existing_hostname == fqdn:
@@ -345,55 +641,34 @@ def add_reservation(content: str, hostname: str, mac: str, ip: str, domain: Opti
             
             if interactive:
                 prompt = (
-                    f"Do you want to remove the old reservation ({existing_hostname} -> {existing_mac} -> {existing_ip}) "
+                    f"Do you want to remove the old reservation ({existing_hostname} -> {mac} -> {existing_ip}) "
                     f"and add the new one ({fqdn} -> {mac} -> {ip})?"
                 )
                 if not get_user_confirmation(prompt):
                     print(f"Skipping reservation: {fqdn} -> {mac} -> {ip}")
-                    return content, False, "User declined to overwrite conflicting reservation"
+                    return False, "User declined to overwrite conflicting reservation"
                 
                 # Remove the old reservation first
                 print(f"Removing conflicting reservation: {existing_hostname}")
-                content, removed = remove_reservation(content, existing_hostname.split('.')[0], domain)
+                removed = remove_reservation(draft, existing_hostname.split('.')[0], domain)
                 if not removed:
-                    return content, False, f"Failed to remove conflicting reservation for {existing_hostname}"
+                    return False, f"Failed to remove conflicting reservation for {existing_hostname}"
             else:
                 error = f"Conflict: MAC {mac} is already used by {existing_hostname}. Run in interactive mode to resolve conflicts."
                 print(f"ERROR: {error}")
-                return content, False, error
+                return False, error
     
     # Now add/update the reservation
-    start, end = find_reservation_block(content, fqdn)
     block = build_reservation_block(hostname, mac, ip, domain)
-    
-    if start != -1:
-        # Replace existing block
-        prefix = ''
-        if start > 0 and content[start-1] != '\n':
-            prefix = '\n'
-        
-        new_content = content[:start] + prefix + block + content[end:]
-        changed = (prefix + block) != content[start:end]
-        return new_content, changed, None
-    
-    # Append with a separating newline if needed
-    if content and not content.endswith('\n'):
-        content += '\n'
-    new_content = content + block
-    return new_content, True, None
-
-
-def remove_reservation(content: str, hostname: str, domain: Optional[str]) -> Tuple[str, bool]:
-    fqdn = f"{hostname}.{domain}" if domain and not hostname.endswith(f".{domain}") else hostname
-    start, end = find_reservation_block(content, fqdn)
-    if start == -1:
-        return content, False
-    
-    new_content = content[:start] + content[end:]
-    return new_content, True
+    return draft.set_block(fqdn, mac, ip, block), None
 
 
-def parse_args() -> argparse.Namespace:
+def remove_reservation(draft: ConfDraft, hostname: str, domain: Optional[str]) -> bool:
+    fqdn = qualify_hostname(hostname, domain)
+    return draft.remove_block(fqdn)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description='Manage DHCP reservations in dhcpd.conf (add/remove/export)',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -444,11 +719,18 @@ Environment variables:
     parser.add_argument('--non-interactive', action='store_true', help='Run in non-interactive mode')
     parser.add_argument('--skip-validation', action='store_true', help='Skip dhcpd.conf syntax validation')
     parser.add_argument('--debug', action='store_true', help='Enable verbose output')
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 
-def main() -> int:
-    args = parse_args()
+def main(argv: Optional[List[str]] = None,
+         records: Optional[List[Tuple[str, Optional[str], Optional[str]]]] = None) -> int:
+    """
+    Apply the requested DHCP reservation changes to dhcpd.conf.
+    
+    Already validated (hostname, mac, ip) records can be passed in directly,
+    in which case --file, --hostname, --mac and --ip are ignored.
+    """
+    args = parse_args(argv)
 
     # Resolve config path
     config_path = (
@@ -470,8 +752,8 @@ def main() -> int:
     # Handle export action separately
     if args.action == 'export':
         try:
-            content = load_config_text(config_path)
-            reservations = extract_all_reservations(content)
+            with open_config_mmap(config_path) as data:
+                reservations = extract_all_reservations(data)
             
             if not reservations:
                 print("No DHCP reservations found in dhcpd.conf")
@@ -488,16 +770,16 @@ def main() -> int:
             return 1
 
     # Determine records to process
-    records: List[Tuple[str, Optional[str], Optional[str]]] = []
-    if args.file:
+    if records is not None:
+        records = list(records)
+    elif args.file:
         try:
-            batch = parse_csv(args.file)
-            for hostname, mac, ip in batch:
-                records.append((hostname, mac, ip))
+            records = list(_iter_parse_csv(args.file))
         except Exception as e:
             print(f"ERROR: {e}")
             return 1
     else:
+        records = []
         if args.action == 'add':
             if not args.hostname or not args.mac or not args.ip:
                 print('ERROR: --hostname, --mac, and --ip are required for add when not using --file')
@@ -527,12 +809,19 @@ def main() -> int:
     if not args.skip_validation:
         if args.debug:
             print("Validating current dhcpd.conf syntax...")
-        is_valid, error_msg = validate_dhcpd_syntax(config_path, verbose=args.debug)
-        if not is_valid:
-            print(f"ERROR: Current dhcpd.conf has syntax errors:")
-            print(error_msg)
-            print("\nPlease fix the syntax errors before using this script.")
-            return 1
+        if is_validation_cached(config_path):
+            if args.debug:
+                print("✓ dhcpd.conf unchanged since last successful validation")
+        else:
+            is_valid, error_msg = validate_dhcpd_syntax(config_path, verbose=args.debug)
+            if not is_valid:
+                print(f"ERROR: Current dhcpd.conf has syntax errors:")
+                print(error_msg)
+                print("\nPlease fix the syntax errors before using this script.")
+                return 1
+            # Only cache real dhcpd -t results, not the "binary not found" skip
+            if not error_msg:
+                record_validation(config_path)
 
     # Create backup
     backup_path = None
@@ -554,33 +843,32 @@ def main() -> int:
     if args.debug:
         print(f"Processing {total} record(s)...")
 
+    # Collect all edits against the loaded content and assemble it once
+    draft = ConfDraft(content)
+
     for (hostname, mac, ip) in records:
         try:
             if args.action == 'add':
-                new_content, changed, error = add_reservation(
-                    content, hostname, mac or '', ip or '', domain, interactive=interactive_mode
+                changed, error = add_reservation(
+                    draft, hostname, mac or '', ip or '', domain, interactive=interactive_mode
                 )
                 if error:
                     print(f"ERROR: {hostname}: {error}")
                     fail += 1
                     continue
             else:
-                new_content, changed = remove_reservation(content, hostname, domain)
+                changed = remove_reservation(draft, hostname, domain)
                 
-            if changed:
-                content = new_content
-                ok += 1
-            else:
-                if args.debug:
-                    print(f"No change needed for host: {hostname}")
-                ok += 1
+            if not changed and args.debug:
+                print(f"No change needed for host: {hostname}")
+            ok += 1
         except Exception as e:
             print(f"ERROR: failed processing host {hostname}: {e}")
             fail += 1
 
     # Save the updated configuration
     try:
-        save_config_text(config_path, content)
+        save_config_text(config_path, draft.render())
     except Exception as e:
         print(f"ERROR: failed writing config: {e}")
         return 1
@@ -608,6 +896,8 @@ def main() -> int:
         else:
             if args.debug:
                 print("✓ Updated dhcpd.conf syntax is valid")
+            if not error_msg:
+                record_validation(config_path)
 
     print(f"\nSummary: {ok} successful, {fail} failed, total {total}")
     return 0 if fail == 0 else 1
@@ -17,32 +17,35 @@ Features:
 """
 
 import argparse
+import contextlib
 import csv
+import ipaddress
 import os
-import re
 import sys
+import tempfile
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
 # Import shared CSV parsing utility
-from csv_utils import parse_mac_ip_csv
+from csv_utils import iter_mac_ip_csv
 
 
 DEFAULT_HOST_VARS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ansible', 'host_vars'))
 
+# host_vars keys read back by parse_host_vars_file -> result field
+_HOST_VARS_KEYS = (('my_hostname:', 'hostname'), ('static_ip:', 'ip'))
+
 
 def validate_ip(ip: str) -> bool:
-    parts = ip.split('.')
-    if len(parts) != 4:
-        return False
     try:
-        return all(0 <= int(p) <= 255 for p in parts)
-    except (ValueError, TypeError):
+        ipaddress.IPv4Address(ip)
+        return True
+    except ValueError:
         return False
 
 
 def fqdn_to_shortname(fqdn: str) -> str:
-    return fqdn.split('.')[0]
+    return fqdn.partition('.')[0]
 
 
 def ensure_host_vars_dir(path: str) -> None:
@@ -54,17 +57,16 @@ def parse_host_vars_file(file_path: str) -> Dict[str, str]:
     data = {}
     try:
         with open(file_path, 'r') as f:
-            content = f.read()
-            
-            # Extract my_hostname
-            hostname_match = re.search(r'^my_hostname:\s*(.+)$', content, re.MULTILINE)
-            if hostname_match:
-                data['hostname'] = hostname_match.group(1).strip()
-            
-            # Extract static_ip
-            ip_match = re.search(r'^static_ip:\s*(.+)$', content, re.MULTILINE)
-            if ip_match:
-                data['ip'] = ip_match.group(1).strip()
+            # Files are flat "key: value" lines; take the first my_hostname and static_ip
+            for line in f:
+                for key, field in _HOST_VARS_KEYS:
+                    if field not in data and line.startswith(key):
+                        value = line[len(key):].strip()
+                        if value:
+                            data[field] = value
+                        break
+                if len(data) == len(_HOST_VARS_KEYS):
+                    break
     except Exception as e:
         print(f"WARNING: Failed to parse {file_path}: {e}")
     
@@ -78,22 +80,85 @@ def scan_host_vars_directory(dir_path: str) -> Dict[str, Dict[str, str]]:
     if not os.path.isdir(dir_path):
         return results
     
-    for filename in os.listdir(dir_path):
-        if filename.endswith('.yml') or filename.endswith('.yaml'):
-            file_path = os.path.join(dir_path, filename)
-            if os.path.isfile(file_path):
-                data = parse_host_vars_file(file_path)
+    # DirEntry caches the file type, so no extra stat() per entry
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            if entry.name.endswith(('.yml', '.yaml')) and entry.is_file():
+                data = parse_host_vars_file(entry.path)
                 if data:
-                    results[filename] = data
+                    results[entry.name] = data
     
     return results
 
 
-def find_conflicts(dir_path: str, fqdn: str, ip: str) -> Tuple[Optional[str], Optional[str]]:
-    """Check if hostname or IP already exists in any host_vars file."""
-    existing_files = scan_host_vars_directory(dir_path)
+class HostVarsIndex:
+    """
+    In-memory view of a host_vars directory.
+    
+    Holds the parsed data of every file plus reverse lookups by hostname
+    and IP. It is kept in sync as files are written and deleted, so batch
+    runs scan the directory once instead of once per record.
+    """
+    
+    def __init__(self, files: Optional[Dict[str, Dict[str, str]]] = None):
+        self.files: Dict[str, Dict[str, str]] = {}
+        # value -> filenames (dict used as an insertion-ordered set)
+        self.by_hostname: Dict[str, Dict[str, None]] = {}
+        self.by_ip: Dict[str, Dict[str, None]] = {}
+        for filename, data in (files or {}).items():
+            self.add(filename, data)
+    
+    @classmethod
+    def from_directory(cls, dir_path: str) -> 'HostVarsIndex':
+        return cls(scan_host_vars_directory(dir_path))
+    
+    def add(self, filename: str, data: Dict[str, str]) -> None:
+        """Record (or replace) the parsed data of a file."""
+        self.remove(filename)
+        self.files[filename] = data
+        if 'hostname' in data:
+            self.by_hostname.setdefault(data['hostname'], {})[filename] = None
+        if 'ip' in data:
+            self.by_ip.setdefault(data['ip'], {})[filename] = None
+    
+    def remove(self, filename: str) -> None:
+        """Forget a file, e.g. after it was deleted."""
+        data = self.files.pop(filename, None)
+        if data is None:
+            return
+        for key, lookup in (('hostname', self.by_hostname), ('ip', self.by_ip)):
+            filenames = lookup.get(data.get(key))
+            if filenames is not None:
+                filenames.pop(filename, None)
+                if not filenames:
+                    del lookup[data[key]]
+
+
+def find_conflicts(dir_path: str, fqdn: str, ip: str,
+                   index: Optional[HostVarsIndex] = None) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Check if hostname or IP already exists in any host_vars file.
+    
+    If index is given, it is consulted instead of rescanning dir_path.
+    """
     expected_filename = f"{fqdn}.yml"
     
+    if index is not None:
+        # Report the last matching file, like the directory scan below
+        hostname_conflict = next(
+            (filename for filename in reversed(index.by_hostname.get(fqdn, {}))
+             if filename != expected_filename),
+            None
+        )
+        ip_conflict = next(
+            (filename for filename in reversed(index.by_ip.get(ip, {}))
+             if filename != expected_filename or index.files[filename].get('hostname') != fqdn),
+            None
+        )
+        return hostname_conflict, ip_conflict
+    
+    existing_files = scan_host_vars_directory(dir_path)
+    
     hostname_conflict = None
     ip_conflict = None
     
@@ -126,21 +191,27 @@ def get_user_confirmation(prompt: str) -> bool:
             return False
 
 
-def write_host_vars_file(dir_path: str, fqdn: str, ip: str, interactive: bool = True) -> Tuple[Optional[str], Optional[str]]:
-    """Write a host_vars YAML file with conflict detection."""
-    short = fqdn_to_shortname(fqdn)
-    expected_path = os.path.join(dir_path, f"{fqdn}.yml")
+def _resolve_conflicts(dir_path: str, fqdn: str, ip: str, interactive: bool,
+                       index: HostVarsIndex) -> Optional[Tuple[Optional[str], Optional[str]]]:
+    """
+    Check the target file and conflicts for a record, deleting conflicting
+    files if approved.
     
-    # Check for conflicts
-    hostname_conflict, ip_conflict = find_conflicts(dir_path, fqdn, ip)
+    Returns None if the file should be written, otherwise the final
+    (path, error) result for write_host_vars_file.
+    """
+    expected_path = os.path.join(dir_path, f"{fqdn}.yml")
     
     # Check if the exact file already exists with the same content
-    if os.path.exists(expected_path):
-        existing_data = parse_host_vars_file(expected_path)
+    existing_data = index.files.get(f"{fqdn}.yml")
+    if existing_data:
         if existing_data.get('hostname') == fqdn and existing_data.get('ip') == ip:
             print(f"Host vars for {fqdn} -> {ip} already exists, skipping")
             return expected_path, None
     
+    # Check for conflicts
+    hostname_conflict, ip_conflict = find_conflicts(dir_path, fqdn, ip, index)
+    
     # Handle conflicts
     files_to_delete = set()
     
@@ -163,8 +234,7 @@ def write_host_vars_file(dir_path: str, fqdn: str, ip: str, interactive: bool =
         
         if interactive:
             for conf_file in conflict_files:
-                conf_path = os.path.join(dir_path, conf_file)
-                conf_data = parse_host_vars_file(conf_path)
+                conf_data = index.files.get(conf_file, {})
                 print(f"  Conflicting file: {conf_file}")
                 print(f"    hostname: {conf_data.get('hostname', 'N/A')}")
                 print(f"    IP: {conf_data.get('ip', 'N/A')}")
@@ -185,12 +255,33 @@ def write_host_vars_file(dir_path: str, fqdn: str, ip: str, interactive: bool =
         conf_path = os.path.join(dir_path, conf_file)
         try:
             os.remove(conf_path)
+            index.remove(conf_file)
             print(f"Deleted conflicting file: {conf_file}")
         except Exception as e:
             error = f"Failed to delete {conf_file}: {e}"
             print(f"ERROR: {error}")
             return None, error
     
+    return None
+
+
+def write_host_vars_file(dir_path: str, fqdn: str, ip: str, interactive: bool = True,
+                         index: Optional[HostVarsIndex] = None) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Write a host_vars YAML file with conflict detection.
+    
+    Pass a HostVarsIndex of dir_path when writing many files; it is used for
+    conflict checks and updated with every file deleted or written.
+    """
+    short = fqdn_to_shortname(fqdn)
+    expected_path = os.path.join(dir_path, f"{fqdn}.yml")
+    if index is None:
+        index = HostVarsIndex.from_directory(dir_path)
+    
+    result = _resolve_conflicts(dir_path, fqdn, ip, interactive, index)
+    if result is not None:
+        return result
+    
     # Write the new file
     content = (
         f"my_hostname: {fqdn}\n"
@@ -198,11 +289,21 @@ def write_host_vars_file(dir_path: str, fqdn: str, ip: str, interactive: bool =
         f"static_ip: {ip}\n"
     )
     
+    # Write to a uniquely named temporary file and rename it into place, so a
+    # crash never leaves a partial file behind for the next directory scan
+    tmp_path = None
     try:
-        with open(expected_path, 'w') as f:
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{fqdn}.", suffix='.tmp', dir=dir_path)
+        with os.fdopen(fd, 'w') as f:
+            os.fchmod(f.fileno(), 0o644)
             f.write(content)
+        os.replace(tmp_path, expected_path)
+        index.add(f"{fqdn}.yml", {'hostname': fqdn, 'ip': ip})
         return expected_path, None
     except Exception as e:
+        if tmp_path:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
         error = f"Failed to write file: {e}"
         print(f"ERROR: {error}")
         return None, error
@@ -210,7 +311,7 @@ def write_host_vars_file(dir_path: str, fqdn: str, ip: str, interactive: bool =
 
 def parse_csv(file_path: str) -> List[Tuple[str, str]]:
     """Parse CSV file and extract hostname (FQDN) and IP address."""
-    full_records = parse_mac_ip_csv(
+    full_records = iter_mac_ip_csv(
         file_path=file_path,
         mac_validator=None,
         ip_validator=validate_ip
@@ -219,7 +320,7 @@ def parse_csv(file_path: str) -> List[Tuple[str, str]]:
     return [(hostname, ip) for hostname, _mac, ip in full_records]
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description='Generate Ansible host_vars files (static_ip, my_hostname, my_shortname)',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -247,17 +348,24 @@ CSV format (unified; header optional):
     parser.add_argument('--out-dir', type=str, help=f'Output directory (default: {DEFAULT_HOST_VARS_DIR})')
     parser.add_argument('--non-interactive', action='store_true', help='Run in non-interactive mode')
     parser.add_argument('--debug', action='store_true', help='Enable verbose output')
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 
-def main() -> int:
-    args = parse_args()
+def main(argv: Optional[List[str]] = None, records: Optional[List[Tuple[str, str]]] = None) -> int:
+    """
+    Generate host_vars files for the records given on the command line.
+    
+    Already validated (fqdn, ip) records can be passed in directly, in which
+    case --file, --hostname and --ip are ignored.
+    """
+    args = parse_args(argv)
 
     out_dir = args.out_dir or DEFAULT_HOST_VARS_DIR
     ensure_host_vars_dir(out_dir)
 
-    records: List[Tuple[str, str]] = []
-    if args.file:
+    if records is not None:
+        records = list(records)
+    elif args.file:
         try:
             records = parse_csv(args.file)
         except Exception as e:
@@ -280,9 +388,12 @@ def main() -> int:
     if args.debug:
         print(f"Processing {len(records)} record(s)...")
     
+    # Parse the existing files once; the index is updated as records are written
+    index = HostVarsIndex.from_directory(out_dir)
+    
     for fqdn, ip in records:
         try:
-            out_path, error = write_host_vars_file(out_dir, fqdn, ip, interactive=interactive_mode)
+            out_path, error = write_host_vars_file(out_dir, fqdn, ip, interactive=interactive_mode, index=index)
             
             if error:
                 print(f"ERROR: {fqdn}: {error}")
@@ -8,13 +8,12 @@ with the provisioning workflow.
 """
 
 import argparse
+import asyncio
 import csv
 import ipaddress
 import logging
 import os
-import subprocess
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import List, Optional, Tuple
 
@@ -26,6 +25,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# SSH options shared by every connection
+_SSH_BASE_OPTS = (
+    '-o', 'StrictHostKeyChecking=no',
+    '-o', 'UserKnownHostsFile=/dev/null',
+    '-o', 'BatchMode=yes',
+)
+
+# Optional TCP reachability probe run before each SSH session; it connects
+# straight to port 22, so it ignores ssh_config Port and ProxyJump settings
+_SSH_PORT = 22
+_PROBE_CONCURRENCY = 256
+
+# Remote command printing the hostname followed by the en0 interface details,
+# falling back to networksetup if ifconfig fails; the MAC is extracted locally
+_REMOTE_INFO_CMD = "hostname && (ifconfig en0 || networksetup -getmacaddress Ethernet)"
+
 
 def parse_ip_range(ip_spec: str) -> List[str]:
     """
@@ -49,9 +64,7 @@ def parse_ip_range(ip_spec: str) -> List[str]:
     if '/' in ip_spec:
         try:
             network = ipaddress.ip_network(ip_spec, strict=False)
-            for ip in network.hosts():
-                ips.append(str(ip))
-            return ips
+            return [str(ip) for ip in network.hosts()]
         except ValueError as e:
             raise ValueError(f"Invalid CIDR notation: {ip_spec}") from e
     
@@ -77,11 +90,12 @@ def parse_ip_range(ip_spec: str) -> List[str]:
             # Full IP range: 10.0.0.10-10.0.0.20
             start_ip = ipaddress.ip_address(start)
             end_ip = ipaddress.ip_address(end)
+            addresses = range(int(start_ip), int(end_ip) + 1)
             
-            current = start_ip
-            while current <= end_ip:
-                ips.append(str(current))
-                current = ipaddress.ip_address(int(current) + 1)
+            if start_ip.version == 4:
+                ips = [f"{i >> 24}.{(i >> 16) & 0xff}.{(i >> 8) & 0xff}.{i & 0xff}" for i in addresses]
+            else:
+                ips = [str(ipaddress.IPv6Address(i)) for i in addresses]
         
         return ips
     
@@ -93,7 +107,33 @@ def parse_ip_range(ip_spec: str) -> List[str]:
         raise ValueError(f"Invalid IP address: {ip_spec}") from e
 
 
-def collect_mac_info(ip: str, user: str, key_path: Optional[str], timeout: int) -> Optional[Tuple[str, str, str]]:
+def parse_remote_info(output: str) -> Tuple[str, str]:
+    """
+    Parse the output of _REMOTE_INFO_CMD.
+    
+    Args:
+        output: Hostname line followed by ifconfig or networksetup output
+        
+    Returns:
+        Tuple of (hostname, mac_address); either is '' if not found
+    """
+    lines = output.splitlines()
+    hostname = lines[0].strip() if lines else ''
+    mac_address = ''
+    for line in lines[1:]:
+        # ifconfig: "\tether 00:11:22:33:44:55"
+        # networksetup: "Ethernet Address: 00:11:22:33:44:55 (Device: en0)"
+        if 'ether ' in line:
+            mac_address = line.split('ether ', 1)[1].split()[0].lower()
+            break
+        if line.startswith('Ethernet Address:'):
+            value = line.split(':', 1)[1].split()
+            mac_address = value[0].lower() if value else ''
+            break
+    return hostname, mac_address
+
+
+async def collect_mac_info(ip: str, user: str, key_path: Optional[str], timeout: int) -> Optional[Tuple[str, str, str]]:
     """
     Collect MAC address and hostname from a remote Mac via SSH.
     
@@ -110,64 +150,43 @@ def collect_mac_info(ip: str, user: str, key_path: Optional[str], timeout: int)
         logger.info(f"Collecting info from {ip}...")
         
         # Build SSH command
-        ssh_cmd = [
-            'ssh',
-            '-o', 'StrictHostKeyChecking=no',
-            '-o', 'UserKnownHostsFile=/dev/null',
-            '-o', f'ConnectTimeout={timeout}',
-            '-o', 'BatchMode=yes',
-        ]
-        
+        ssh_cmd = ['ssh', *_SSH_BASE_OPTS, '-o', f'ConnectTimeout={timeout}']
         if key_path:
-            ssh_cmd.extend(['-i', key_path])
-        
+            ssh_cmd.extend(('-i', key_path))
         ssh_cmd.append(f"{user}@{ip}")
         
-        # Get hostname
-        hostname_cmd = ssh_cmd + ['hostname']
-        hostname_result = subprocess.run(
-            hostname_cmd,
-            capture_output=True,
-            text=True,
-            timeout=timeout + 5
+        # Get hostname and MAC address of en0 (primary Ethernet interface) in
+        # one session
+        proc = await asyncio.create_subprocess_exec(
+            *ssh_cmd, _REMOTE_INFO_CMD,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
         )
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout + 5)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise
         
-        if hostname_result.returncode != 0:
-            logger.warning(f"Failed to get hostname from {ip}: {hostname_result.stderr.strip()}")
+        if proc.returncode != 0:
+            logger.warning(f"Failed to collect info from {ip}: {stderr.decode(errors='replace').strip()}")
             return None
         
-        hostname = hostname_result.stdout.strip()
+        hostname, mac_address = parse_remote_info(stdout.decode(errors='replace'))
         
-        # Get MAC address from en0 (primary Ethernet interface)
-        mac_cmd = ssh_cmd + ["ifconfig en0 | grep ether | awk '{print $2}'"]
-        mac_result = subprocess.run(
-            mac_cmd,
-            capture_output=True,
-            text=True,
-            timeout=timeout + 5,
-            shell=False
-        )
-        
-        # Alternative: try using networksetup if ifconfig fails
-        if mac_result.returncode != 0 or not mac_result.stdout.strip():
-            mac_cmd = ssh_cmd + ["networksetup -getmacaddress Ethernet | awk '{print $3}'"]
-            mac_result = subprocess.run(
-                mac_cmd,
-                capture_output=True,
-                text=True,
-                timeout=timeout + 5
-            )
+        if not hostname:
+            logger.warning(f"Failed to get hostname from {ip}")
+            return None
         
-        if mac_result.returncode != 0 or not mac_result.stdout.strip():
+        if not mac_address:
             logger.warning(f"Failed to get MAC address from {ip}")
             return None
         
-        mac_address = mac_result.stdout.strip().lower()
-        
         logger.info(f"✓ {ip}: {hostname} ({mac_address})")
         return (hostname, mac_address, ip)
         
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         logger.warning(f"Timeout connecting to {ip}")
         return None
     except Exception as e:
@@ -175,6 +194,73 @@ def collect_mac_info(ip: str, user: str, key_path: Optional[str], timeout: int)
         return None
 
 
+async def is_ssh_reachable(ip: str, timeout: float) -> bool:
+    """
+    Check whether the SSH port of a host accepts TCP connections.
+    
+    Args:
+        ip: IP address of the host
+        timeout: Connect timeout in seconds
+        
+    Returns:
+        True if the connection succeeded, False otherwise
+    """
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(ip, _SSH_PORT), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    return True
+
+
+async def collect_all(ips: List[str], user: str, key_path: Optional[str], timeout: int,
+                      max_workers: int, probe_timeout: float = 0) -> Tuple[List[Tuple[str, str, str]], List[str]]:
+    """
+    Collect inventory from all hosts concurrently on a single event loop.
+    
+    Args:
+        ips: IP addresses to collect from
+        user: SSH username
+        key_path: Path to SSH private key (optional)
+        timeout: SSH connection timeout in seconds
+        max_workers: Maximum number of concurrent SSH sessions
+        probe_timeout: If set, skip hosts whose SSH port does not accept a
+            TCP connection within this many seconds
+        
+    Returns:
+        Tuple of (records, failed IPs), in completion order
+    """
+    semaphore = asyncio.Semaphore(max_workers)
+    probe_semaphore = asyncio.Semaphore(_PROBE_CONCURRENCY)
+    
+    async def collect(ip: str) -> Tuple[str, Optional[Tuple[str, str, str]]]:
+        if probe_timeout:
+            async with probe_semaphore:
+                reachable = await is_ssh_reachable(ip, probe_timeout)
+            if not reachable:
+                logger.warning(f"{ip}: SSH port not reachable, skipping")
+                return ip, None
+        
+        async with semaphore:
+            try:
+                return ip, await collect_mac_info(ip, user, key_path, timeout)
+            except Exception as e:
+                logger.error(f"Exception processing {ip}: {e}")
+                return ip, None
+    
+    records = []
+    failed = []
+    
+    for next_result in asyncio.as_completed([collect(ip) for ip in ips]):
+        ip, result = await next_result
+        if result:
+            records.append(result)
+        else:
+            failed.append(ip)
+    
+    return records, failed
+
+
 def write_csv(records: List[Tuple[str, str, str]], output_path: str) -> None:
     """
     Write collected records to a CSV file.
@@ -186,8 +272,7 @@ def write_csv(records: List[Tuple[str, str, str]], output_path: str) -> None:
     with open(output_path, 'w', newline='') as f:
         writer = csv.writer(f)
         writer.writerow(['hostname', 'mac', 'ip'])
-        for record in records:
-            writer.writerow(record)
+        writer.writerows(records)
     
     logger.info(f"✓ CSV file created: {output_path}")
     logger.info(f"  Total records: {len(records)}")
@@ -266,6 +351,15 @@ Output Format:
         help='SSH connection timeout in seconds (default: 10)'
     )
     
+    parser.add_argument(
+        '--probe-timeout',
+        type=float,
+        default=0,
+        help='Skip hosts whose port 22 does not accept a TCP connection within '
+             'this many seconds (e.g. 3). Off by default: the probe bypasses '
+             'ssh_config Port/ProxyJump settings (default: 0, disabled)'
+    )
+    
     parser.add_argument(
         '--max-workers',
         type=int,
@@ -314,12 +408,7 @@ def main() -> int:
                 return 1
     
     # Remove duplicates while preserving order
-    seen = set()
-    unique_ips = []
-    for ip in all_ips:
-        if ip not in seen:
-            seen.add(ip)
-            unique_ips.append(ip)
+    unique_ips = list(dict.fromkeys(all_ips))
     
     logger.info(f"Total IPs to process: {len(unique_ips)}")
     logger.info(f"Starting inventory collection for {len(unique_ips)} host(s)...")
@@ -328,32 +417,10 @@ def main() -> int:
     logger.info("=" * 70)
     
     # Collect inventory in parallel
-    records = []
-    failed = []
-    
-    with ThreadPoolExecutor(max_workers=args.max_workers) as executor:
-        future_to_ip = {
-            executor.submit(
-                collect_mac_info,
-                ip,
-                args.user,
-                args.key,
-                args.timeout
-            ): ip
-            for ip in unique_ips
-        }
-        
-        for future in as_completed(future_to_ip):
-            ip = future_to_ip[future]
-            try:
-                result = future.result()
-                if result:
-                    records.append(result)
-                else:
-                    failed.append(ip)
-            except Exception as e:
-                logger.error(f"Exception processing {ip}: {e}")
-                failed.append(ip)
+    records, failed = asyncio.run(
+        collect_all(unique_ips, args.user, args.key, args.timeout, args.max_workers,
+                    probe_timeout=args.probe_timeout)
+    )
     
     logger.info("=" * 70)
     logger.info(f"Collection complete: {len(records)} successful, {len(failed)} failed")
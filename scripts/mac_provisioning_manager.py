@@ -14,15 +14,23 @@ Supports both single-host and batch processing modes.
 
 import argparse
 import csv
+import importlib
+import ipaddress
 import logging
 import os
+import re
+import selectors
 import subprocess
 import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional, Tuple
+from types import ModuleType
+from typing import ClassVar, List, Optional, Set, Tuple
 
 # Import shared CSV parsing utility
-from csv_utils import parse_mac_ip_csv
+from csv_utils import iter_mac_ip_csv
 
 # Configure logging
 logging.basicConfig(
@@ -32,10 +40,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Lines of command output kept per stream for failure reports
+_OUTPUT_TAIL_LINES = 500
+
+# Parallel ansible-playbook workers used for the DHCP deployment
+_ANSIBLE_FORKS = 20
+
+# Normalized (lowercase, colon-separated) MAC address
+_MAC_RE = re.compile(r"[0-9a-f]{2}(:[0-9a-f]{2}){5}")
+
 
 class MacProvisioningManager:
     """Orchestrates Mac provisioning workflow across multiple tools."""
     
+    # (scripts_dir, ansible_dir) pairs whose dependencies were already verified
+    _verified: ClassVar[Set[Tuple[str, str]]] = set()
+    
     def __init__(self, scripts_dir: str, ansible_dir: str):
         """
         Initialize the provisioning manager.
@@ -54,11 +74,28 @@ class MacProvisioningManager:
         self.hostvars_script = self.scripts_dir / 'host_vars_generator.py'
         self.dhcp_playbook = self.ansible_dir / 'dhcpd_deploy.yml'
         
+        # String forms used when building sys.path entries and commands
+        self._scripts_dir_str = os.fspath(self.scripts_dir)
+        self._dhcp_playbook_str = os.fspath(self.dhcp_playbook)
+        self._default_inventory_str = os.fspath(self.ansible_dir / 'hosts.example.ini')
+        
+        # Scripts imported for in-process runs, keyed by module name
+        self._modules = {}
+        
+        # Pooled HTTP sessions shared by all runs against the same service
+        self._http_sessions = {}
+        self._http_lock = threading.Lock()
+        self._import_lock = threading.Lock()
+        
         # Verify required files exist
         self._verify_dependencies()
     
     def _verify_dependencies(self) -> None:
         """Verify that all required scripts and playbooks exist."""
+        key = (self._scripts_dir_str, os.fspath(self.ansible_dir))
+        if key in self._verified:
+            return
+        
         required_files = [
             self.nautobot_script,
             self.powerdns_script,
@@ -67,17 +104,109 @@ class MacProvisioningManager:
             self.dhcp_playbook
         ]
         
-        missing_files = [f for f in required_files if not f.exists()]
+        # List each directory once instead of stat-ing every file
+        entries = {}
+        for f in required_files:
+            if f.parent not in entries:
+                try:
+                    with os.scandir(f.parent) as it:
+                        entries[f.parent] = {e.name for e in it if e.is_file()}
+                except OSError:
+                    entries[f.parent] = set()
+        
+        missing_files = [f for f in required_files if f.name not in entries[f.parent]]
         
         if missing_files:
             logger.error("Missing required files:")
             for f in missing_files:
-                logger.error(f"  - {f}")
+                logger.error("  - %s", f)
             raise FileNotFoundError("Required dependencies not found")
         
+        self._verified.add(key)
         logger.debug("All dependencies verified")
     
-    def _run_command(self, command: List[str], description: str, interactive: bool = False) -> bool:
+    def _load_script(self, script: Path) -> ModuleType:
+        """Import a sibling script as a module, caching it for later calls."""
+        # Steps can start concurrently; only one of them may set up sys.path
+        with self._import_lock:
+            module = self._modules.get(script.stem)
+            if module is None:
+                if self._scripts_dir_str not in sys.path:
+                    sys.path.insert(0, self._scripts_dir_str)
+                module = importlib.import_module(script.stem)
+                self._modules[script.stem] = module
+        return module
+    
+    def _http_session(self, service: str):
+        """
+        Return the keep-alive HTTP session for a service, creating it on first use.
+        
+        Each service gets its own session so authentication headers set by
+        one script never leak into requests to another.
+        """
+        with self._http_lock:
+            session = self._http_sessions.get(service)
+            if session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+                
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=32,
+                    pool_maxsize=32,
+                    max_retries=Retry(total=3, backoff_factor=0.3)
+                )
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._http_sessions[service] = session
+            return session
+    
+    def _run_script(self, script: Path, argv: List[str], description: str,
+                    http_service: Optional[str] = None, **main_kwargs) -> bool:
+        """
+        Run a sibling script's main() in-process and log the results.
+        
+        Args:
+            script: Path to the script
+            argv: Command line arguments for the script
+            description: Human-readable description for logging
+            http_service: If set, pass the shared HTTP session for this
+                service to the script's main()
+            **main_kwargs: Extra keyword arguments for the script's main()
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        logger.info("Running: %s", description)
+        logger.debug("Command: %s %s", script.name, ' '.join(argv))
+        
+        try:
+            if http_service:
+                main_kwargs['session'] = self._http_session(http_service)
+            returncode = self._load_script(script).main(argv, **main_kwargs)
+        except SystemExit as e:
+            # argparse errors and missing-dependency checks exit instead of
+            # returning; map the code the way the interpreter would
+            if e.code is None:
+                returncode = 0
+            elif isinstance(e.code, int):
+                returncode = e.code
+            else:
+                returncode = 1
+        except Exception as e:
+            logger.error("✗ %s failed with exception: %s", description, e)
+            return False
+        
+        if returncode == 0:
+            logger.info("✓ %s completed successfully", description)
+            return True
+        
+        logger.error("✗ %s failed with exit code %s", description, returncode)
+        return False
+    
+    def _run_command(self, command: List[str], description: str, interactive: bool = False,
+                     env: Optional[dict] = None, stream: bool = False) -> bool:
         """
         Run a shell command and log the results.
         
@@ -85,152 +214,193 @@ class MacProvisioningManager:
             command: Command to execute as list of arguments
             description: Human-readable description for logging
             interactive: If True, allow user interaction
+            env: Environment for the command (defaults to the current one)
+            stream: If True, let the command write straight to the terminal
             
         Returns:
             True if successful, False otherwise
         """
-        logger.info(f"Running: {description}")
-        logger.debug(f"Command: {' '.join(command)}")
+        logger.info("Running: %s", description)
+        logger.debug("Command: %s", ' '.join(command))
         
         try:
-            if interactive:
-                result = subprocess.run(command, check=False)
+            if interactive or stream:
+                result = subprocess.run(command, check=False, env=env)
                 
                 if result.returncode == 0:
-                    logger.info(f"✓ {description} completed successfully")
+                    logger.info("✓ %s completed successfully", description)
                     return True
                 else:
-                    logger.error(f"✗ {description} failed with exit code {result.returncode}")
+                    logger.error("✗ %s failed with exit code %s", description, result.returncode)
                     return False
             else:
-                result = subprocess.run(
+                # Stream output as it arrives, keeping only the tail of each
+                # stream in memory for the failure report
+                proc = subprocess.Popen(
                     command,
-                    capture_output=True,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
                     text=True,
-                    check=False
+                    bufsize=1,
+                    env=env
                 )
+                tails = {
+                    'Output': deque(maxlen=_OUTPUT_TAIL_LINES),
+                    'Error': deque(maxlen=_OUTPUT_TAIL_LINES),
+                }
                 
-                if result.returncode == 0:
-                    logger.info(f"✓ {description} completed successfully")
-                    if result.stdout:
-                        logger.debug(f"Output: {result.stdout}")
+                with selectors.DefaultSelector() as selector:
+                    selector.register(proc.stdout, selectors.EVENT_READ, 'Output')
+                    selector.register(proc.stderr, selectors.EVENT_READ, 'Error')
+                    while selector.get_map():
+                        for key, _ in selector.select():
+                            line = key.fileobj.readline()
+                            if not line:
+                                selector.unregister(key.fileobj)
+                                continue
+                            line = line.rstrip('\n')
+                            tails[key.data].append(line)
+                            logger.debug("%s: %s", key.data, line)
+                
+                proc.stdout.close()
+                proc.stderr.close()
+                returncode = proc.wait()
+                
+                if returncode == 0:
+                    logger.info("✓ %s completed successfully", description)
                     return True
                 else:
-                    logger.error(f"✗ {description} failed with exit code {result.returncode}")
-                    if result.stdout:
-                        logger.error(f"Output: {result.stdout}")
-                    if result.stderr:
-                        logger.error(f"Error: {result.stderr}")
+                    logger.error("✗ %s failed with exit code %s", description, returncode)
+                    for stream, lines in tails.items():
+                        if lines:
+                            logger.error("%s: %s", stream, '\n'.join(lines))
                     return False
                 
         except Exception as e:
-            logger.error(f"✗ {description} failed with exception: {e}")
+            logger.error("✗ %s failed with exception: %s", description, e)
             return False
     
     def provision_nautobot(self, csv_file: Optional[str], hostname: Optional[str],
                           ip: Optional[str], action: str, nautobot_url: Optional[str],
-                          nautobot_token: Optional[str], verify_ssl: bool) -> bool:
+                          nautobot_token: Optional[str], verify_ssl: bool,
+                          records: Optional[List[Tuple[str, str]]] = None) -> bool:
         """Manage IP addresses in Nautobot."""
-        command = [
-            'python3',
-            str(self.nautobot_script),
-            '--action', action
-        ]
+        argv = ['--action', action]
         
         if nautobot_url:
-            command.extend(['--url', nautobot_url])
+            argv.extend(['--url', nautobot_url])
         
         if nautobot_token:
-            command.extend(['--token', nautobot_token])
+            argv.extend(['--token', nautobot_token])
         
         if not verify_ssl:
-            command.append('--no-verify-ssl')
+            argv.append('--no-verify-ssl')
         
-        if csv_file:
-            command.extend(['--file', csv_file])
-        else:
-            command.extend(['--hostname', hostname, '--ip', ip])
+        # Records are handed over in-process when available
+        if records is None:
+            if csv_file:
+                argv.extend(['--file', csv_file])
+            else:
+                argv.extend(['--hostname', hostname, '--ip', ip])
         
         description = f"Nautobot IP {action}"
-        return self._run_command(command, description, interactive=False)
+        return self._run_script(self.nautobot_script, argv, description,
+                                http_service='nautobot', records=records)
     
     def provision_dns(self, csv_file: Optional[str], hostname: Optional[str], 
-                     ip: Optional[str], domain: str, non_interactive: bool) -> bool:
+                     ip: Optional[str], domain: str, non_interactive: bool,
+                     records: Optional[List[Tuple[str, str]]] = None) -> bool:
         """Create DNS A records."""
-        command = [
-            'python3',
-            str(self.powerdns_script),
+        argv = [
             '--domain', domain,
             '--action', 'add'
         ]
         
         if non_interactive:
-            command.append('--non-interactive')
+            argv.append('--non-interactive')
         
-        if csv_file:
-            command.extend(['--file', csv_file])
-        else:
-            command.extend(['--hostname', hostname, '--ip', ip])
+        if records is None:
+            if csv_file:
+                argv.extend(['--file', csv_file])
+            else:
+                argv.extend(['--hostname', hostname, '--ip', ip])
         
-        return self._run_command(command, "DNS record creation", interactive=not non_interactive)
+        return self._run_script(self.powerdns_script, argv, "DNS record creation",
+                                http_service='powerdns', records=records)
     
     def provision_dhcp(self, csv_file: Optional[str], hostname: Optional[str],
-                      mac: Optional[str], ip: Optional[str], non_interactive: bool) -> bool:
+                      mac: Optional[str], ip: Optional[str], non_interactive: bool,
+                      records: Optional[List[Tuple[str, str, str]]] = None) -> bool:
         """Create DHCP reservations."""
-        command = [
-            'python3',
-            str(self.dhcp_script),
-            '--action', 'add'
-        ]
+        argv = ['--action', 'add']
         
         if non_interactive:
-            command.append('--non-interactive')
+            argv.append('--non-interactive')
         
-        if csv_file:
-            command.extend(['--file', csv_file])
-        else:
-            command.extend(['--hostname', hostname, '--mac', mac, '--ip', ip])
+        if records is None:
+            if csv_file:
+                argv.extend(['--file', csv_file])
+            else:
+                argv.extend(['--hostname', hostname, '--mac', mac, '--ip', ip])
         
-        return self._run_command(command, "DHCP reservation creation", interactive=not non_interactive)
+        return self._run_script(self.dhcp_script, argv, "DHCP reservation creation", records=records)
     
-    def deploy_dhcp(self, inventory_file: Optional[str] = None) -> bool:
-        """Deploy DHCP configuration via Ansible."""
+    def deploy_dhcp(self, inventory_file: Optional[str] = None, stream: bool = False) -> bool:
+        """Deploy DHCP configuration via Ansible, optionally showing its live output."""
         if not inventory_file:
-            inventory_file = str(self.ansible_dir / 'hosts.example.ini')
+            inventory_file = self._default_inventory_str
         
         command = [
             'ansible-playbook',
-            str(self.dhcp_playbook),
+            self._dhcp_playbook_str,
             '-i', inventory_file
         ]
         
-        return self._run_command(command, "DHCP deployment (Ansible)")
+        # Pipelining cuts the SSH round-trips per task and the free strategy
+        # lets fast DHCP servers finish without waiting on slower ones.
+        # Explicit settings in the caller's environment still win.
+        env = os.environ.copy()
+        env.setdefault('ANSIBLE_PIPELINING', 'True')
+        env.setdefault('ANSIBLE_SSH_PIPELINING', 'True')
+        env.setdefault('ANSIBLE_FORKS', str(_ANSIBLE_FORKS))
+        env.setdefault('ANSIBLE_STRATEGY', 'free')
+        
+        return self._run_command(command, "DHCP deployment (Ansible)", env=env, stream=stream)
     
     def generate_host_vars(self, csv_file: Optional[str], hostname: Optional[str],
-                          ip: Optional[str], non_interactive: bool = False) -> bool:
+                          ip: Optional[str], non_interactive: bool = False,
+                          records: Optional[List[Tuple[str, str]]] = None) -> bool:
         """Generate Ansible host_vars files."""
-        command = [
-            'python3',
-            str(self.hostvars_script)
-        ]
+        argv = []
         
         if non_interactive:
-            command.append('--non-interactive')
+            argv.append('--non-interactive')
         
-        if csv_file:
-            command.extend(['--file', csv_file])
-        else:
-            command.extend(['--hostname', hostname, '--ip', ip])
+        if records is None:
+            if csv_file:
+                argv.extend(['--file', csv_file])
+            else:
+                argv.extend(['--hostname', hostname, '--ip', ip])
         
-        return self._run_command(command, "Host vars file generation", interactive=not non_interactive)
+        return self._run_script(self.hostvars_script, argv, "Host vars file generation", records=records)
     
     def provision(self, csv_file: Optional[str], hostname: Optional[str],
                  mac: Optional[str], ip: Optional[str], domain: str,
                  non_interactive: bool, skip_nautobot: bool, skip_dns: bool,
                  skip_dhcp: bool, skip_deploy: bool, skip_hostvars: bool,
                  nautobot_url: Optional[str] = None, nautobot_token: Optional[str] = None,
-                 verify_ssl: bool = True, inventory_file: Optional[str] = None) -> bool:
-        """Execute the complete provisioning workflow."""
+                 verify_ssl: bool = True, inventory_file: Optional[str] = None,
+                 records: Optional[List[Tuple[str, str, str, str]]] = None) -> bool:
+        """
+        Execute the complete provisioning workflow.
+        
+        When the (fqdn, short_hostname, mac, ip) records from parse_csv are
+        passed along with csv_file, they are handed to each stage directly
+        instead of re-reading the file. Each stage gets all records in one
+        call and batches its own API work. In non-interactive mode the
+        independent steps of a multi-host run also run concurrently with
+        each other; a single host goes straight through the steps in order.
+        """
         logger.info("=" * 70)
         logger.info("Mac Provisioning Manager - Starting Workflow")
         logger.info("=" * 70)
@@ -243,62 +413,118 @@ class MacProvisioningManager:
             'hostvars': None
         }
         
+        # Per-stage views of the already validated CSV records
+        host_ips = short_ips = dhcp_records = None
+        if records is not None:
+            host_ips = [(fqdn, record_ip) for fqdn, _short, _mac, record_ip in records]
+            short_ips = [(short, record_ip) for _fqdn, short, _mac, record_ip in records]
+            dhcp_records = [(fqdn, record_mac, record_ip) for fqdn, _short, record_mac, record_ip in records]
+        
         # Step 1: Add IP to Nautobot
-        if not skip_nautobot:
+        def step_nautobot() -> bool:
+            if skip_nautobot:
+                logger.info("\n[Step 1/5] Skipping Nautobot IP management (--skip-nautobot)")
+                return True
+            
             logger.info("\n[Step 1/5] Adding IP addresses to Nautobot...")
-            results['nautobot'] = self.provision_nautobot(
-                csv_file, hostname, ip, 'add', nautobot_url, nautobot_token, verify_ssl
+            success = self.provision_nautobot(
+                csv_file, hostname, ip, 'add', nautobot_url, nautobot_token, verify_ssl,
+                records=host_ips
             )
-            if not results['nautobot']:
+            if not success:
                 logger.error("Nautobot IP management failed. Continuing with remaining steps...")
-        else:
-            logger.info("\n[Step 1/5] Skipping Nautobot IP management (--skip-nautobot)")
-            results['nautobot'] = True
+            return success
         
         # Step 2: Create DNS records
-        if not skip_dns:
+        def step_dns() -> bool:
+            if skip_dns:
+                logger.info("\n[Step 2/5] Skipping DNS record creation (--skip-dns)")
+                return True
+            
             logger.info("\n[Step 2/5] Creating DNS A records...")
-            short_hostname = hostname.split('.')[0] if hostname and '.' in hostname else hostname
-            results['dns'] = self.provision_dns(
-                csv_file, short_hostname, ip, domain, non_interactive
+            short_hostname = hostname.partition('.')[0] if hostname else hostname
+            success = self.provision_dns(
+                csv_file, short_hostname, ip, domain, non_interactive,
+                records=short_ips
             )
-            if not results['dns']:
+            if not success:
                 logger.error("DNS record creation failed. Continuing with remaining steps...")
-        else:
-            logger.info("\n[Step 2/5] Skipping DNS record creation (--skip-dns)")
-            results['dns'] = True
+            return success
         
         # Step 3: Create DHCP reservations
-        if not skip_dhcp:
+        def step_dhcp() -> bool:
+            if skip_dhcp:
+                logger.info("\n[Step 3/5] Skipping DHCP reservation creation (--skip-dhcp)")
+                return True
+            
             logger.info("\n[Step 3/5] Creating DHCP reservations...")
-            results['dhcp'] = self.provision_dhcp(
-                csv_file, hostname, mac, ip, non_interactive
+            success = self.provision_dhcp(
+                csv_file, hostname, mac, ip, non_interactive, records=dhcp_records
             )
-            if not results['dhcp']:
+            if not success:
                 logger.error("DHCP reservation creation failed. Continuing with remaining steps...")
-        else:
-            logger.info("\n[Step 3/5] Skipping DHCP reservation creation (--skip-dhcp)")
-            results['dhcp'] = True
+            return success
         
         # Step 4: Deploy DHCP configuration
-        if not skip_deploy:
+        def step_deploy(dhcp_ok: bool) -> bool:
+            if skip_deploy:
+                logger.info("\n[Step 4/5] Skipping DHCP deployment (--skip-deploy)")
+                return True
+            
+            if not dhcp_ok:
+                logger.error("\n[Step 4/5] Skipping DHCP deployment: DHCP reservation creation failed")
+                return False
+            
             logger.info("\n[Step 4/5] Deploying DHCP configuration...")
-            results['deploy'] = self.deploy_dhcp(inventory_file)
-            if not results['deploy']:
+            # Show Ansible's progress directly when someone is watching
+            success = self.deploy_dhcp(
+                inventory_file,
+                stream=not non_interactive or logger.isEnabledFor(logging.DEBUG)
+            )
+            if not success:
                 logger.error("DHCP deployment failed. Continuing with remaining steps...")
-        else:
-            logger.info("\n[Step 4/5] Skipping DHCP deployment (--skip-deploy)")
-            results['deploy'] = True
+            return success
         
         # Step 5: Generate host_vars files
-        if not skip_hostvars:
+        def step_hostvars() -> bool:
+            if skip_hostvars:
+                logger.info("\n[Step 5/5] Skipping host_vars generation (--skip-hostvars)")
+                return True
+            
             logger.info("\n[Step 5/5] Generating Ansible host_vars files...")
-            results['hostvars'] = self.generate_host_vars(csv_file, hostname, ip, non_interactive)
-            if not results['hostvars']:
+            success = self.generate_host_vars(csv_file, hostname, ip, non_interactive, records=host_ips)
+            if not success:
                 logger.error("Host vars generation failed.")
+            return success
+        
+        single_host = records is None or len(records) <= 1
+        
+        if non_interactive and not single_host:
+            # Steps 1, 2, 3 and 5 are independent; only the deployment has
+            # to wait for the DHCP reservations. Each of them writes to its own
+            # backend (Nautobot, PowerDNS, dhcpd.conf, host_vars) and loads its
+            # existing data once, so running them side by side cannot lose
+            # updates. Their log lines may interleave; each names its host or
+            # IP, and the per-step summary below is printed once all are done.
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                futures = {
+                    'nautobot': executor.submit(step_nautobot),
+                    'dns': executor.submit(step_dns),
+                    'dhcp': executor.submit(step_dhcp),
+                    'hostvars': executor.submit(step_hostvars),
+                }
+                results['dhcp'] = futures['dhcp'].result()
+                results['deploy'] = step_deploy(results['dhcp'])
+                for step, future in futures.items():
+                    results[step] = future.result()
         else:
-            logger.info("\n[Step 5/5] Skipping host_vars generation (--skip-hostvars)")
-            results['hostvars'] = True
+            # Steps may prompt the user (and a single host gains nothing
+            # from a thread pool), so run them one after another
+            results['nautobot'] = step_nautobot()
+            results['dns'] = step_dns()
+            results['dhcp'] = step_dhcp()
+            results['deploy'] = step_deploy(results['dhcp'])
+            results['hostvars'] = step_hostvars()
         
         # Summary
         logger.info("\n" + "=" * 70)
@@ -323,38 +549,42 @@ class MacProvisioningManager:
 
 def validate_ip(ip: str) -> bool:
     """Validate IP address format."""
-    parts = ip.split('.')
-    if len(parts) != 4:
-        return False
     try:
-        return all(0 <= int(p) <= 255 for p in parts)
-    except (ValueError, TypeError):
+        ipaddress.IPv4Address(ip)
+        return True
+    except ValueError:
         return False
 
 
 def validate_mac(mac: str) -> bool:
     """Validate MAC address format."""
-    import re
     mac = mac.strip().lower().replace('-', ':')
-    return bool(re.fullmatch(r"[0-9a-f]{2}(:[0-9a-f]{2}){5}", mac))
+    return bool(_MAC_RE.fullmatch(mac))
 
 
 def normalize_mac_address(mac: str) -> Optional[str]:
     """Normalize and validate MAC address."""
-    import re
     mac = mac.strip().lower().replace('-', ':')
-    if re.fullmatch(r"[0-9a-f]{2}(:[0-9a-f]{2}){5}", mac):
+    if _MAC_RE.fullmatch(mac):
         return mac
     return None
 
 
-def parse_csv(file_path: str) -> List[Tuple[str, str, str]]:
-    """Parse CSV file in unified format: hostname (FQDN), mac, ip."""
-    return parse_mac_ip_csv(
-        file_path=file_path,
-        mac_validator=normalize_mac_address,
-        ip_validator=validate_ip
-    )
+def parse_csv(file_path: str) -> List[Tuple[str, str, str, str]]:
+    """
+    Parse CSV file in unified format: hostname (FQDN), mac, ip.
+    
+    Returns:
+        List of tuples (fqdn, short_hostname, mac, ip)
+    """
+    return [
+        (fqdn, fqdn.partition('.')[0], mac, ip)
+        for fqdn, mac, ip in iter_mac_ip_csv(
+            file_path=file_path,
+            mac_validator=normalize_mac_address,
+            ip_validator=validate_ip
+        )
+    ]
 
 
 def parse_arguments() -> argparse.Namespace:
@@ -493,7 +723,8 @@ def main() -> int:
             nautobot_url=args.nautobot_url,
             nautobot_token=args.nautobot_token,
             verify_ssl=not args.no_verify_ssl,
-            inventory_file=args.inventory
+            inventory_file=args.inventory,
+            records=records if args.file else None
         )
         
         return 0 if success else 1
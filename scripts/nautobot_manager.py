@@ -8,9 +8,15 @@ It supports adding and removing IP addresses within IP prefixes.
 
 import argparse
 import csv
+import ipaddress
 import json
 import logging
+import re
+import socket
 import sys
+import threading
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
 import os
 
@@ -22,6 +28,7 @@ except ImportError:
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
     from urllib3.exceptions import InsecureRequestWarning
     requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
 except ImportError:
@@ -37,11 +44,47 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Addresses per batched IP address lookup, keeping request URLs short
+_FILTER_BATCH_SIZE = 100
+
+# Records processed concurrently; API calls are latency-bound, not CPU-bound
+_MAX_WORKERS = 16
+
+# Keep-alive connections pooled per host, enough for every worker
+_POOL_SIZE = 32
+
+# IPv4 netmasks as integers, indexed by prefix length
+_V4_MASKS = tuple((0xFFFFFFFF << (32 - i)) & 0xFFFFFFFF for i in range(33))
+
+# Keywords that mark the first CSV row as a header
+_HEADER_RE = re.compile(r'hostname|host|name|ip|address|mac')
+
+# The prefix fields used when creating IP addresses, without the full API
+# response each pynautobot record carries
+PrefixRecord = namedtuple('PrefixRecord', 'prefix id vrf_id namespace_id tenant_id')
+
+
+def _to_prefix_record(prefix) -> PrefixRecord:
+    """Extract the fields used downstream from a pynautobot prefix."""
+    def related_id(field: str) -> Optional[str]:
+        related = getattr(prefix, field, None)
+        return related.id if related else None
+    
+    return PrefixRecord(
+        prefix=str(prefix.prefix),
+        id=prefix.id,
+        vrf_id=related_id('vrf'),
+        namespace_id=related_id('namespace'),
+        tenant_id=related_id('tenant')
+    )
+
 
 class NautobotManager:
     """Manages Nautobot IP addresses via REST API."""
     
-    def __init__(self, url: str, token: str, verify_ssl: bool = True):
+    def __init__(self, url: str, token: str, verify_ssl: bool = True,
+                 http_session: Optional[requests.Session] = None,
+                 cache_prefixes: bool = False):
         """
         Initialize Nautobot Manager.
         
@@ -49,10 +92,23 @@ class NautobotManager:
             url: Nautobot server URL
             token: Nautobot API token for authentication
             verify_ssl: Verify SSL certificates (default: True)
+            http_session: Existing requests session to reuse (default: a new
+                pooled session)
+            cache_prefixes: Fetch all prefixes once and match locally instead
+                of querying Nautobot per lookup (worthwhile for batches)
         """
         self.url = url.rstrip('/')
         self.token = token
         self.verify_ssl = verify_ssl
+        self.cache_prefixes = cache_prefixes
+        
+        # All prefixes, fetched once on first use
+        self._prefix_cache: Optional[List[PrefixRecord]] = None
+        
+        # IPv4 prefixes indexed by length, built on the first prefix lookup
+        self._v4_prefix_table: Optional[Dict[int, Dict[int, PrefixRecord]]] = None
+        self._v4_prefix_masks: List[Tuple[int, Dict[int, PrefixRecord]]] = []
+        self._prefix_lock = threading.Lock()
         
         try:
             self.api = pynautobot.api(
@@ -60,61 +116,129 @@ class NautobotManager:
                 token=self.token,
                 verify=self.verify_ssl
             )
+            if http_session is None:
+                http_session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=_POOL_SIZE, pool_maxsize=_POOL_SIZE)
+                http_session.mount('https://', adapter)
+                http_session.mount('http://', adapter)
+            http_session.verify = self.verify_ssl
+            self.api.http_session = http_session
             logger.debug(f"Connected to Nautobot at {self.url}")
         except Exception as e:
             logger.error(f"Failed to connect to Nautobot: {e}")
             raise
     
-    def find_prefix_for_ip(self, ip_address: str) -> Optional[Dict]:
-        """Find the IP prefix that contains the given IP address."""
-        try:
-            logger.debug(f"Searching for prefix containing {ip_address}...")
-            
-            ip_parts = [int(p) for p in ip_address.split('.')]
-            ip_int = (ip_parts[0] << 24) + (ip_parts[1] << 16) + (ip_parts[2] << 8) + ip_parts[3]
-            
-            prefixes = self.api.ipam.prefixes.all()
+    def _get_prefixes(self) -> List[PrefixRecord]:
+        """Return all prefixes, fetching them from Nautobot only once."""
+        if self._prefix_cache is None:
+            self._prefix_cache = [_to_prefix_record(p) for p in self.api.ipam.prefixes.all()]
+            logger.debug("Cached %d prefix(es)", len(self._prefix_cache))
+        return self._prefix_cache
+    
+    def _build_v4_prefix_table(self) -> Dict[int, Dict[int, PrefixRecord]]:
+        """
+        Index all IPv4 prefixes for longest-prefix matching.
+        
+        Returns:
+            Dict mapping prefix length to {network address as int: prefix}
+        """
+        table = {}
+        
+        for prefix in self._get_prefixes():
+            prefix_str = prefix.prefix
+            if '/' not in prefix_str:
+                continue
             
-            best_match = None
-            best_match_size = 0
+            if ':' in prefix_str:
+                logger.debug("Skipping IPv6 prefix: %s", prefix_str)
+                continue
             
-            for prefix in prefixes:
-                prefix_str = str(prefix.prefix)
-                if '/' not in prefix_str:
-                    continue
+            try:
+                network = ipaddress.IPv4Network(prefix_str, strict=False)
                 
-                if ':' in prefix_str:
-                    logger.debug(f"Skipping IPv6 prefix: {prefix_str}")
+                # A catch-all /0 never counted as a match
+                if network.prefixlen == 0:
                     continue
-                    
-                try:
-                    network, prefix_len = prefix_str.split('/')
-                    prefix_len = int(prefix_len)
-                    
-                    net_parts = network.split('.')
-                    if len(net_parts) != 4:
-                        continue
-                    
-                    net_parts = [int(p) for p in net_parts]
-                    net_int = (net_parts[0] << 24) + (net_parts[1] << 16) + (net_parts[2] << 8) + net_parts[3]
-                    
-                    mask = (0xFFFFFFFF << (32 - prefix_len)) & 0xFFFFFFFF
-                    
-                    if (ip_int & mask) == (net_int & mask):
-                        if prefix_len > best_match_size:
-                            best_match = prefix
-                            best_match_size = prefix_len
-                            logger.debug(f"Found matching prefix: {prefix_str}")
                 
-                except (ValueError, IndexError) as e:
-                    logger.debug(f"Error parsing prefix {prefix_str}: {e}")
-                    continue
+                # Keep the first prefix seen for a given network, as the
+                # linear scan used to
+                table.setdefault(network.prefixlen, {}).setdefault(
+                    int(network.network_address), prefix
+                )
+            
+            except ValueError as e:
+                logger.debug("Error parsing prefix %s: %s", prefix_str, e)
+                continue
+        
+        return table
+    
+    def _find_cached_prefix(self, ip_address: str) -> Optional[PrefixRecord]:
+        """Find the longest matching prefix in the locally cached prefixes."""
+        ip_int = int.from_bytes(socket.inet_pton(socket.AF_INET, ip_address), 'big')
+        
+        # Built on first use, then at most one lookup per prefix length
+        if self._v4_prefix_table is None:
+            with self._prefix_lock:
+                if self._v4_prefix_table is None:
+                    table = self._build_v4_prefix_table()
+                    # Masks are precomputed, longest prefix first
+                    self._v4_prefix_masks = [
+                        (_V4_MASKS[prefix_len], table[prefix_len])
+                        for prefix_len in sorted(table, reverse=True)
+                    ]
+                    self._v4_prefix_table = table
+        
+        for mask, networks in self._v4_prefix_masks:
+            prefix = networks.get(ip_int & mask)
+            if prefix is not None:
+                return prefix
+        return None
+    
+    def _query_prefix(self, ip_address: str) -> Optional[PrefixRecord]:
+        """Find the longest matching prefix among those Nautobot reports as containing the IP."""
+        best_match = None
+        best_match_size = 0
+        
+        for prefix in self.api.ipam.prefixes.filter(contains=ip_address):
+            prefix_str = str(prefix.prefix)
+            if '/' not in prefix_str or ':' in prefix_str:
+                continue
+            
+            try:
+                prefix_len = int(prefix_str.split('/')[1])
+            except ValueError:
+                continue
+            
+            if prefix_len > best_match_size:
+                best_match = prefix
+                best_match_size = prefix_len
+        
+        return _to_prefix_record(best_match) if best_match else None
+    
+    def find_prefix_for_ip(self, ip_address: str,
+                           pending: Optional[Future] = None) -> Optional[PrefixRecord]:
+        """
+        Find the IP prefix that contains the given IP address.
+        
+        Args:
+            ip_address: IPv4 address to look up
+            pending: Already running _query_prefix call to take the result from
+        """
+        try:
+            logger.debug("Searching for prefix containing %s...", ip_address)
+            
+            if pending is not None:
+                best_match = pending.result()
+            elif self.cache_prefixes:
+                best_match = self._find_cached_prefix(ip_address)
+            else:
+                best_match = self._query_prefix(ip_address)
             
             if best_match:
-                logger.info(f"Found prefix: {best_match.prefix} (ID: {best_match.id})")
+                logger.info("Found prefix: %s (ID: %s)", best_match.prefix, best_match.id)
                 return best_match
             else:
-                logger.warning(f"No IPv4 prefix found containing IP {ip_address}")
+                logger.warning("No IPv4 prefix found containing IP %s", ip_address)
                 return None
                 
         except Exception as e:
@@ -132,11 +256,44 @@ class NautobotManager:
             logger.error(f"Error retrieving IP address: {e}")
             return None
     
+    def get_ip_addresses(self, ip_addresses: List[str]) -> Optional[Dict[str, object]]:
+        """
+        Get IP address objects for many addresses using batched filter queries.
+        
+        Args:
+            ip_addresses: Addresses in CIDR form (e.g. 192.168.1.100/32)
+            
+        Returns:
+            Dict mapping each existing address to its object, or None on error.
+            add_ip_address/remove_ip_address keep it up to date when given it.
+        """
+        existing = {}
+        try:
+            for i in range(0, len(ip_addresses), _FILTER_BATCH_SIZE):
+                batch = ip_addresses[i:i + _FILTER_BATCH_SIZE]
+                for ip_object in self.api.ipam.ip_addresses.filter(address=batch):
+                    existing.setdefault(str(ip_object.address), ip_object)
+            return existing
+        except Exception as e:
+            logger.error(f"Error retrieving IP addresses: {e}")
+            return None
+    
     def add_ip_address(self, ip_address: str, hostname: str = None, 
-                      description: str = None, dry_run: bool = False) -> bool:
+                      description: str = None, dry_run: bool = False,
+                      existing_map: Optional[Dict[str, object]] = None) -> bool:
         """Add an IP address to Nautobot."""
         try:
-            existing_ip = self.get_ip_address(f"{ip_address}/32")
+            pending_prefix = None
+            if existing_map is not None:
+                existing_ip = existing_map.get(f"{ip_address}/32")
+            elif self.cache_prefixes:
+                existing_ip = self.get_ip_address(f"{ip_address}/32")
+            else:
+                # Both lookups are API calls here, so overlap them; the prefix
+                # is simply not used when the address already exists
+                with ThreadPoolExecutor(max_workers=1) as executor:
+                    pending_prefix = executor.submit(self._query_prefix, ip_address)
+                    existing_ip = self.get_ip_address(f"{ip_address}/32")
             
             if existing_ip:
                 logger.info(f"IP address {ip_address} already exists in Nautobot")
@@ -165,7 +322,7 @@ class NautobotManager:
                     logger.info(f"IP address {ip_address} is up to date")
                     return True
             
-            prefix = self.find_prefix_for_ip(ip_address)
+            prefix = self.find_prefix_for_ip(ip_address, pending=pending_prefix)
             
             if not prefix:
                 logger.error(f"Cannot add IP {ip_address}: no matching prefix found")
@@ -188,18 +345,20 @@ class NautobotManager:
             elif hostname:
                 ip_data['description'] = hostname
             
-            if hasattr(prefix, 'vrf') and prefix.vrf:
-                ip_data['vrf'] = prefix.vrf.id
+            if prefix.vrf_id:
+                ip_data['vrf'] = prefix.vrf_id
             
-            if hasattr(prefix, 'namespace') and prefix.namespace:
-                ip_data['namespace'] = prefix.namespace.id
+            if prefix.namespace_id:
+                ip_data['namespace'] = prefix.namespace_id
             
-            if hasattr(prefix, 'tenant') and prefix.tenant:
-                ip_data['tenant'] = prefix.tenant.id
+            if prefix.tenant_id:
+                ip_data['tenant'] = prefix.tenant_id
             
             logger.info(f"Creating IP address {ip_address}...")
             new_ip = self.api.ipam.ip_addresses.create(**ip_data)
             logger.info(f"Successfully created IP address {ip_address} (ID: {new_ip.id})")
+            if existing_map is not None:
+                existing_map[ip_data['address']] = new_ip
             
             return True
             
@@ -207,10 +366,14 @@ class NautobotManager:
             logger.error(f"Failed to add IP address {ip_address}: {e}")
             return False
     
-    def remove_ip_address(self, ip_address: str, dry_run: bool = False) -> bool:
+    def remove_ip_address(self, ip_address: str, dry_run: bool = False,
+                          existing_map: Optional[Dict[str, object]] = None) -> bool:
         """Remove an IP address from Nautobot."""
         try:
-            existing_ip = self.get_ip_address(f"{ip_address}/32")
+            if existing_map is not None:
+                existing_ip = existing_map.get(f"{ip_address}/32")
+            else:
+                existing_ip = self.get_ip_address(f"{ip_address}/32")
             
             if not existing_ip:
                 logger.warning(f"IP address {ip_address} does not exist in Nautobot")
@@ -224,6 +387,8 @@ class NautobotManager:
             
             existing_ip.delete()
             logger.info(f"Successfully deleted IP address {ip_address}")
+            if existing_map is not None:
+                existing_map.pop(f"{ip_address}/32", None)
             
             return True
             
@@ -234,12 +399,11 @@ class NautobotManager:
 
 def validateIpAddress(ip_address: str) -> bool:
     """Validate IP address format."""
-    parts = ip_address.split('.')
-    if len(parts) != 4:
-        return False
+    # inet_pton only accepts the strict dotted-quad form, unlike inet_aton
     try:
-        return all(0 <= int(part) <= 255 for part in parts)
-    except (ValueError, TypeError):
+        socket.inet_pton(socket.AF_INET, ip_address)
+        return True
+    except (OSError, ValueError, TypeError):
         return False
 
 
@@ -248,27 +412,29 @@ def parseCsvFile(file_path: str) -> List[Tuple[str, str]]:
     records = []
     
     try:
-        with open(file_path, 'r') as csvfile:
-            lines = csvfile.readlines()
-            lines = [line.strip() for line in lines if line.strip()]
-            
-            if not lines:
-                raise ValueError("CSV file is empty")
-            
-            first_line = lines[0].lower()
-            has_header = any(keyword in first_line for keyword in [
-                'hostname', 'host', 'name', 'ip', 'address', 'mac'
-            ]) and not validateIpAddress(first_line.split(',')[-1].strip())
-            
-            start_line = 1 if has_header else 0
-            
-            if has_header and len(lines) == 1:
-                raise ValueError("CSV file contains only a header row")
-            
-            reader = csv.reader(lines[start_line:])
+        # Rows are parsed and validated in a single streaming pass, without
+        # holding a copy of the whole file in memory
+        with open(file_path, 'r', newline='') as csvfile:
+            reader = csv.reader(csvfile)
+            has_header = None
+            data_rows = 0
             
-            for line_num, row in enumerate(reader, start=start_line + 1):
-                if not row or all(not cell.strip() for cell in row):
+            for row in reader:
+                # Skip blank lines
+                if not row or (len(row) == 1 and not row[0].strip()):
+                    continue
+                
+                if has_header is None:
+                    first_line = ','.join(row).lower()
+                    has_header = (_HEADER_RE.search(first_line) is not None
+                                  and not validateIpAddress(row[-1].strip()))
+                    if has_header:
+                        continue
+                
+                data_rows += 1
+                line_num = reader.line_num
+                
+                if all(not cell.strip() for cell in row):
                     continue
                 
                 if len(row) == 2:
@@ -289,6 +455,12 @@ def parseCsvFile(file_path: str) -> List[Tuple[str, str]]:
                     continue
                 
                 records.append((hostname, ip_address))
+            
+            if has_header is None:
+                raise ValueError("CSV file is empty")
+            
+            if has_header and not data_rows:
+                raise ValueError("CSV file contains only a header row")
         
         if not records:
             raise ValueError("No valid records found in CSV file")
@@ -302,7 +474,7 @@ def parseCsvFile(file_path: str) -> List[Tuple[str, str]]:
         raise ValueError(f"Error reading CSV file: {e}")
 
 
-def parseArguments() -> argparse.Namespace:
+def parseArguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(
         description='Manage IP addresses in Nautobot via REST API',
@@ -337,12 +509,21 @@ Environment Variables:
     parser.add_argument('--dry-run', action='store_true', help='Dry run mode')
     parser.add_argument('--debug', action='store_true', help='Enable debug logging')
     
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 
-def main() -> int:
-    """Main execution function."""
-    args = parseArguments()
+def main(argv: Optional[List[str]] = None, session: Optional[requests.Session] = None,
+         records: Optional[List[Tuple[str, str]]] = None) -> int:
+    """
+    Main execution function.
+    
+    Args:
+        argv: Command line arguments (default: sys.argv[1:])
+        session: Existing requests session to reuse for API calls (optional)
+        records: Already validated (hostname, ip) records; when given,
+            --file, --hostname and --ip are ignored
+    """
+    args = parseArguments(argv)
     
     if args.debug:
         logger.setLevel(logging.DEBUG)
@@ -353,7 +534,9 @@ def main() -> int:
         logger.info("DRY RUN MODE - No changes will be made")
         logger.info("=" * 60)
     
-    if args.file:
+    if records is not None:
+        records = list(records)
+    elif args.file:
         if args.hostname or args.ip:
             logger.warning("Both --file and --hostname/--ip provided. Using --file.")
         
@@ -376,6 +559,12 @@ def main() -> int:
         
         records = [(args.hostname, args.ip)]
     
+    # Repeated rows (e.g. from merged sources) only need to be applied once
+    unique_records = list(dict.fromkeys(records))
+    if len(unique_records) < len(records):
+        logger.info(f"Skipping {len(records) - len(unique_records)} duplicate record(s)")
+        records = unique_records
+    
     url = args.url or os.environ.get('NAUTOBOT_URL')
     if not url:
         logger.error("Nautobot URL not provided. Use --url or set NAUTOBOT_URL")
@@ -389,37 +578,67 @@ def main() -> int:
     verify_ssl = not args.no_verify_ssl
     
     try:
-        nautobot = NautobotManager(url=url, token=token, verify_ssl=verify_ssl)
+        nautobot = NautobotManager(
+            url=url,
+            token=token,
+            verify_ssl=verify_ssl,
+            http_session=session,
+            cache_prefixes=len(records) > 1
+        )
     except Exception as e:
         logger.error(f"Failed to initialize Nautobot manager: {e}")
         return 1
     
     total_records = len(records)
-    successful = 0
-    failed = 0
     
     logger.info(f"Processing {total_records} record(s)...")
     
-    for hostname, ip_address in records:
+    # Look up all existing addresses up front instead of once per record;
+    # on failure each record falls back to its own lookup
+    existing_map = None
+    if total_records > 1:
+        existing_map = nautobot.get_ip_addresses([f"{ip}/32" for _, ip in records])
+    
+    def process(record: Tuple[str, str]) -> bool:
+        hostname, ip_address = record
         logger.info(f"Processing: {hostname} -> {ip_address}")
         
-        success = False
         if args.action == 'add':
-            success = nautobot.add_ip_address(
+            return nautobot.add_ip_address(
                 ip_address=ip_address,
                 hostname=hostname,
-                dry_run=args.dry_run
+                dry_run=args.dry_run,
+                existing_map=existing_map
             )
         elif args.action == 'remove':
-            success = nautobot.remove_ip_address(
+            return nautobot.remove_ip_address(
                 ip_address=ip_address,
-                dry_run=args.dry_run
+                dry_run=args.dry_run,
+                existing_map=existing_map
             )
-        
-        if success:
-            successful += 1
-        else:
-            failed += 1
+        return False
+    
+    # Rows for the same address run in order within one worker, so the last
+    # row still wins; different addresses keep several API calls in flight
+    groups = {}
+    for position, (_hostname, ip_address) in enumerate(records):
+        groups.setdefault(ip_address, []).append(position)
+    
+    results = [False] * total_records
+    
+    def process_group(positions: List[int]) -> None:
+        for position in positions:
+            results[position] = process(records[position])
+    
+    if len(groups) > 1:
+        with ThreadPoolExecutor(max_workers=min(_MAX_WORKERS, len(groups))) as executor:
+            list(executor.map(process_group, groups.values()))
+    else:
+        for positions in groups.values():
+            process_group(positions)
+    
+    successful = sum(results)
+    failed = total_records - successful
     
     logger.info("=" * 60)
     logger.info(f"Summary: {successful} successful, {failed} failed")
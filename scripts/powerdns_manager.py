@@ -7,24 +7,48 @@ It supports adding and removing A records for specified hostnames.
 """
 
 import argparse
+import contextlib
 import csv
+import functools
 import json
 import logging
+import socket
 import sys
 from typing import Dict, List, Optional, Tuple
 import os
 
 # Import shared CSV parsing utility
-from csv_utils import parse_mac_ip_csv
+from csv_utils import iter_mac_ip_csv
 
 try:
     import requests
+    import urllib3
     from requests.adapters import HTTPAdapter
     from urllib3.util.retry import Retry
 except ImportError:
     print("Error: 'requests' module is required. Install it with: pip install requests")
     sys.exit(1)
 
+# orjson is optional; it encodes and decodes zone data much faster than json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps(data) -> bytes:
+    """Serialize data to JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode()
+
+
+def _loads(content: bytes):
+    """Deserialize JSON bytes."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
 
 # Configure logging
 logging.basicConfig(
@@ -38,7 +62,8 @@ logger = logging.getLogger(__name__)
 class PowerDNSManager:
     """Manages PowerDNS A records via REST API."""
     
-    def __init__(self, server_url: str, api_key: str, server_id: str = "localhost"):
+    def __init__(self, server_url: str, api_key: str, server_id: str = "localhost",
+                 session: Optional[requests.Session] = None):
         """
         Initialize PowerDNS Manager.
         
@@ -46,34 +71,61 @@ class PowerDNSManager:
             server_url: PowerDNS API base URL
             api_key: PowerDNS API key for authentication
             server_id: PowerDNS server ID (default: localhost)
+            session: Existing requests session to reuse (optional); its own
+                connection pool and retry settings are kept
         """
         self.server_url = server_url.rstrip('/')
         self.api_key = api_key
         self.server_id = server_id
         self.api_base = f"{self.server_url}/api/v1/servers/{self.server_id}"
-        self.session = self._create_session()
+        self.session = self._create_session(session)
+        # Per-domain zone cache: FQDN -> IPs, and IP -> first FQDN holding it
+        self._zone_cache: Dict[str, Dict[str, List[str]]] = {}
+        self._ip_index: Dict[str, Dict[str, str]] = {}
         
-    def _create_session(self) -> requests.Session:
+    def _create_session(self, session: Optional[requests.Session] = None) -> requests.Session:
         """
         Create a requests session with retry logic.
         
+        Args:
+            session: Existing session to configure instead of creating one
+        
         Returns:
             Configured requests session
         """
-        session = requests.Session()
-        session.headers.update({
+        headers = {
             'X-API-Key': self.api_key,
             'Content-Type': 'application/json'
-        })
+        }
+        # TLS verification is disabled for internal servers with self-signed
+        # certificates. Requests pass session.verify explicitly, since requests
+        # otherwise lets REQUESTS_CA_BUNDLE/CURL_CA_BUNDLE override it
+        if session is not None:
+            session.headers.update(headers)
+            session.verify = False
+            return session
         
-        # Configure retry strategy
+        session = requests.Session()
+        session.headers.update(headers)
+        session.verify = False
+        session.headers['Connection'] = 'keep-alive'
+        
+        # Configure retry strategy: exponential backoff (0s, 2s, 4s, 8s) capped
+        # at 30s, with up to 1s of random jitter so concurrent clients do not
+        # retry in lockstep against a rate-limited server
         retry_strategy = Retry(
-            total=3,
+            total=4,
             backoff_factor=1,
+            backoff_max=30,
+            backoff_jitter=1.0,
             status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["HEAD", "GET", "PUT", "DELETE", "OPTIONS", "TRACE", "PATCH"]
+            allowed_methods=["HEAD", "GET", "PUT", "DELETE", "OPTIONS", "TRACE", "PATCH"],
+            respect_retry_after_header=True,
+            raise_on_status=False
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        # Batch runs talk to a single host: keep one pool with enough
+        # keep-alive connections for every concurrent request
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=32, max_retries=retry_strategy)
         session.mount("http://", adapter)
         session.mount("https://", adapter)
         
@@ -91,10 +143,52 @@ class PowerDNSManager:
         """
         return f"{self.api_base}/zones/{domain}"
     
-    def _ensure_fqdn(self, hostname: str, domain: str) -> str:
+    @staticmethod
+    def _build_rrset(fqdn: str, ips: List[str], ttl: Optional[int] = None) -> Dict:
+        """
+        Build the rrset change that sets a hostname's A records.
+        
+        Args:
+            fqdn: Fully qualified domain name (with trailing dot)
+            ips: IP addresses the hostname should have; empty deletes the rrset
+            ttl: Time to live to set (optional - if None, the current TTL is kept)
+            
+        Returns:
+            REPLACE rrset with the given IPs, or DELETE rrset if there are none
+        """
+        if not ips:
+            return {"name": fqdn, "type": "A", "changetype": "DELETE"}
+        
+        rrset = {"name": fqdn, "type": "A", "changetype": "REPLACE"}
+        if ttl is not None:
+            rrset["ttl"] = ttl
+        rrset["records"] = [{"content": ip, "disabled": False} for ip in ips]
+        return rrset
+    
+    def _patch_zone(self, zone_endpoint: str, rrset_data: Dict) -> requests.Response:
+        """
+        Send a PATCH with rrset changes to a zone.
+        
+        Args:
+            zone_endpoint: Zone endpoint URL
+            rrset_data: Request body ({"rrsets": [...]})
+            
+        Returns:
+            Response from the server
+        """
+        return self.session.patch(zone_endpoint, data=_dumps(rrset_data),
+                                  headers={'Content-Type': 'application/json'},
+                                  verify=self.session.verify)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _ensure_fqdn(hostname: str, domain: str) -> str:
         """
         Ensure hostname is a fully qualified domain name.
         
+        Results are memoized, as the same hostname is resolved several
+        times per record.
+        
         Args:
             hostname: Hostname
             domain: Domain name
@@ -112,30 +206,278 @@ class PowerDNSManager:
             
         return fqdn
     
-    def _get_existing_records(self, domain: str, fqdn: str) -> List[str]:
+    def _load_zone(self, domain: str) -> Optional[Dict[str, List[str]]]:
         """
-        Get existing A records for a hostname.
+        Get the A records of a zone, fetching it only on first use.
+        
+        The zone is read with a single GET and kept in memory together with
+        an IP index; later lookups are served from the cache, which is
+        updated in place after every successful PATCH.
         
         Args:
             domain: Domain name
-            fqdn: Fully qualified domain name
             
         Returns:
-            List of existing IP addresses
+            Dict mapping each FQDN to its IP addresses (in zone order),
+            or None if the zone could not be retrieved
         """
+        names = self._zone_cache.get(domain)
+        if names is not None:
+            return names
+        
+        zone_endpoint = self._get_zone_endpoint(domain)
+        response = self.session.get(zone_endpoint, verify=self.session.verify)
+        response.raise_for_status()
+        
+        names = {}
+        ips = {}
+        for rrset in _loads(response.content).get('rrsets', []):
+            if rrset['type'] == 'A':
+                contents = [record['content'] for record in rrset.get('records', [])]
+                names[rrset['name']] = contents
+                for content in contents:
+                    ips.setdefault(content, rrset['name'])
+        
+        self._zone_cache[domain] = names
+        self._ip_index[domain] = ips
+        return names
+    
+    def _update_cached_rrset(self, domain: str, fqdn: str, contents: List[str]) -> None:
+        """
+        Record a successfully applied rrset change in the zone cache.
+        
+        Args:
+            domain: Domain name
+            fqdn: Fully qualified domain name of the changed rrset
+            contents: IP addresses the rrset now holds (empty if deleted)
+        """
+        names = self._zone_cache.get(domain)
+        if names is None:
+            return
+        ips = self._ip_index[domain]
+        
+        if contents:
+            previous = names.get(fqdn, [])
+            names[fqdn] = list(contents)
+        else:
+            previous = names.pop(fqdn, [])
+        
+        # IPs that are (or were) also held by another rrset are re-resolved
+        # in zone order so the index keeps pointing at the first holder
+        shared = {ip for ip in previous if ip not in contents and ips.get(ip) == fqdn}
+        for ip in contents:
+            owner = ips.setdefault(ip, fqdn)
+            if owner != fqdn:
+                shared.add(ip)
+        if shared:
+            for ip in shared:
+                ips.pop(ip, None)
+            for name, name_ips in names.items():
+                for ip in name_ips:
+                    if ip in shared:
+                        ips.setdefault(ip, name)
+    
+    def bulk_apply(self, domain: str,
+                   changes: List[Tuple[str, str, str, List[str], Optional[int]]]) -> bool:
+        """
+        Apply several rrset changes to a zone with a single PATCH.
+        
+        Args:
+            domain: Domain name
+            changes: List of (fqdn, type, changetype, contents, ttl) tuples;
+                contents and ttl are only used for REPLACE (ttl may be None)
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        rrsets = []
+        for fqdn, record_type, changetype, contents, ttl in changes:
+            rrset = self._build_rrset(fqdn, contents if changetype == 'REPLACE' else [], ttl)
+            rrset["type"] = record_type
+            rrsets.append(rrset)
+        
         try:
-            zone_endpoint = self._get_zone_endpoint(domain)
-            response = self.session.get(zone_endpoint, verify=False)
+            response = self._patch_zone(self._get_zone_endpoint(domain), {"rrsets": rrsets})
             response.raise_for_status()
+            return True
+            
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Failed to apply {len(rrsets)} rrset change(s): {e}")
+            if hasattr(e.response, 'text'):
+                logger.error(f"Response: {e.response.text}")
+            return False
+    
+    def apply_batch(self, domain: str, records: List[Tuple[str, Optional[str]]], action: str,
+                    ttl: int = 3600, interactive: bool = True,
+                    dry_run: bool = False) -> Tuple[int, int]:
+        """
+        Add or remove many A records with one zone lookup and one update.
+        
+        Each record is resolved in order against an in-memory copy of the
+        zone, following the same rules as add_record and remove_record, and
+        all resulting rrset changes are sent in a single PATCH.
+        
+        Args:
+            domain: Domain name
+            records: List of (hostname, ip_address) tuples
+            action: 'add' or 'remove'
+            ttl: Time to live for added records (default: 3600)
+            interactive: If True, prompt user for confirmation on conflicts (default: True)
+            dry_run: If True, only log the changes that would be made; conflicts
+                that would prompt in interactive mode are assumed confirmed
+            
+        Returns:
+            Tuple of (successful, failed) record counts
+        """
+        try:
+            cached = self._load_zone(domain)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Failed to retrieve zone {domain}: {e}")
+            return 0, len(records)
+        zone = {name: list(ips) for name, ips in cached.items()}
+        
+        # Working IP index: each IP maps to the names holding it, in zone order,
+        # so conflict lookups never scan the zone
+        position = {name: i for i, name in enumerate(zone)}
+        holders: Dict[str, List[str]] = {}
+        for name, ips in zone.items():
+            for ip in ips:
+                holders.setdefault(ip, []).append(name)
+        
+        def drop_holder(ip: str, name: str) -> None:
+            names = [holder for holder in holders.get(ip, ()) if holder != name]
+            if names:
+                holders[ip] = names
+            else:
+                holders.pop(ip, None)
+        
+        def add_holder(ip: str, name: str) -> None:
+            names = holders.setdefault(ip, [])
+            names.append(name)
+            names.sort(key=position.__getitem__)
+        
+        # FQDNs whose rrset changed, mapped to the TTL to set (None keeps it)
+        staged = {}
+        # Per record: (success, message to log once the changes are applied)
+        results = []
+        
+        for hostname, ip_address in records:
+            if ip_address:
+                logger.info(f"Processing: {hostname} -> {ip_address}")
+            else:
+                logger.info(f"Processing: {hostname} (all A records)")
             
-            zone_data = response.json()
-            rrsets = zone_data.get('rrsets', [])
+            fqdn = self._ensure_fqdn(hostname, domain)
             
-            for rrset in rrsets:
-                if rrset['name'] == fqdn and rrset['type'] == 'A':
-                    return [record['content'] for record in rrset.get('records', [])]
+            if action == 'add':
+                existing_hostname = next(iter(holders.get(ip_address, ())), None)
+                
+                if existing_hostname == fqdn:
+                    logger.info(f"Record {fqdn} -> {ip_address} already exists, skipping")
+                    results.append((True, None))
+                    continue
+                
+                if existing_hostname:
+                    logger.warning(f"IP {ip_address} is already assigned to {existing_hostname}")
+                    
+                    if interactive and dry_run:
+                        logger.info(f"Would ask to remove {existing_hostname} -> {ip_address} "
+                                    f"and add {fqdn} -> {ip_address}")
+                    elif interactive:
+                        if not getUserConfirmation(
+                            f"Do you want to remove {existing_hostname} -> {ip_address} and add {fqdn} -> {ip_address}?"
+                        ):
+                            logger.info(f"Skipping record: {fqdn} -> {ip_address}")
+                            results.append((False, None))
+                            continue
+                    else:
+                        logger.error(f"Conflict: IP {ip_address} is already used by {existing_hostname}. "
+                                   f"Run in interactive mode to resolve conflicts.")
+                        results.append((False, None))
+                        continue
+                    
+                    if not dry_run:
+                        logger.info(f"Removing conflicting record: {existing_hostname} -> {ip_address}")
+                    zone[existing_hostname] = [ip for ip in zone[existing_hostname] if ip != ip_address]
+                    drop_holder(ip_address, existing_hostname)
+                    staged.setdefault(existing_hostname, None)
+                
+                existing_ips = zone.setdefault(fqdn, [])
+                position.setdefault(fqdn, len(position))
+                if ip_address in existing_ips:
+                    logger.info(f"Record {fqdn} -> {ip_address} already exists")
+                    results.append((True, None))
+                    continue
+                
+                existing_ips.append(ip_address)
+                add_holder(ip_address, fqdn)
+                staged[fqdn] = ttl
+                results.append((True, f"Successfully added A record: {fqdn} -> {ip_address}"))
             
-            return []
+            elif action == 'remove':
+                existing_ips = zone.get(fqdn)
+                if not existing_ips:
+                    logger.warning(f"No A records found for {fqdn}")
+                    results.append((False, None))
+                    continue
+                
+                if ip_address is None:
+                    logger.info(f"Removing all A records for {fqdn} (IPs: {', '.join(existing_ips)})")
+                    for ip in existing_ips:
+                        drop_holder(ip, fqdn)
+                    zone[fqdn] = []
+                    message = f"Successfully removed all A records for {fqdn}"
+                else:
+                    if ip_address not in existing_ips:
+                        logger.warning(f"Record {fqdn} -> {ip_address} does not exist")
+                        results.append((False, None))
+                        continue
+                    zone[fqdn] = [ip for ip in existing_ips if ip != ip_address]
+                    drop_holder(ip_address, fqdn)
+                    message = f"Successfully removed A record: {fqdn} -> {ip_address}"
+                
+                staged.setdefault(fqdn, None)
+                results.append((True, message))
+        
+        if staged and dry_run:
+            for fqdn in staged:
+                if zone[fqdn]:
+                    logger.info(f"[DRY RUN] Would set {fqdn} -> {', '.join(zone[fqdn])}")
+                else:
+                    logger.info(f"[DRY RUN] Would delete all A records for {fqdn}")
+        elif staged:
+            changes = [
+                (fqdn, 'A', 'REPLACE', zone[fqdn], staged_ttl) if zone[fqdn]
+                else (fqdn, 'A', 'DELETE', [], None)
+                for fqdn, staged_ttl in staged.items()
+            ]
+            logger.info(f"Applying {len(changes)} rrset change(s) to {domain}...")
+            if self.bulk_apply(domain, changes):
+                for fqdn in staged:
+                    self._update_cached_rrset(domain, fqdn, zone[fqdn])
+                for _, message in results:
+                    if message:
+                        logger.info(message)
+            else:
+                # Records that needed a change fail along with the update
+                results = [(success and not message, message) for success, message in results]
+        
+        successful = sum(1 for success, _ in results if success)
+        return successful, len(results) - successful
+    
+    def _get_existing_records(self, domain: str, fqdn: str) -> List[str]:
+        """
+        Get existing A records for a hostname.
+        
+        Args:
+            domain: Domain name
+            fqdn: Fully qualified domain name
+            
+        Returns:
+            List of existing IP addresses
+        """
+        try:
+            return list(self._load_zone(domain).get(fqdn, []))
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Failed to retrieve existing records: {e}")
@@ -153,20 +495,8 @@ class PowerDNSManager:
             Hostname (FQDN) if found, None otherwise
         """
         try:
-            zone_endpoint = self._get_zone_endpoint(domain)
-            response = self.session.get(zone_endpoint, verify=False)
-            response.raise_for_status()
-            
-            zone_data = response.json()
-            rrsets = zone_data.get('rrsets', [])
-            
-            for rrset in rrsets:
-                if rrset['type'] == 'A':
-                    for record in rrset.get('records', []):
-                        if record['content'] == ip_address:
-                            return rrset['name']
-            
-            return None
+            self._load_zone(domain)
+            return self._ip_index[domain].get(ip_address)
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Failed to search for hostname by IP: {e}")
@@ -230,23 +560,12 @@ class PowerDNSManager:
         
         # Add the new IP to existing ones
         all_ips = existing_ips + [ip_address]
-        records = [{"content": ip, "disabled": False} for ip in all_ips]
-        
-        rrset_data = {
-            "rrsets": [
-                {
-                    "name": fqdn,
-                    "type": "A",
-                    "ttl": ttl,
-                    "changetype": "REPLACE",
-                    "records": records
-                }
-            ]
-        }
+        rrset_data = {"rrsets": [self._build_rrset(fqdn, all_ips, ttl)]}
         
         try:
-            response = self.session.patch(zone_endpoint, json=rrset_data, verify=False)
+            response = self._patch_zone(zone_endpoint, rrset_data)
             response.raise_for_status()
+            self._update_cached_rrset(domain, fqdn, all_ips)
             logger.info(f"Successfully added A record: {fqdn} -> {ip_address}")
             return True
             
@@ -277,37 +596,14 @@ class PowerDNSManager:
             logger.warning(f"IP {ip_address} not found in {fqdn}")
             return False
         
-        # Remove the IP from existing ones
+        # Remove the IP from existing ones; the rrset is deleted if no IPs remain
         remaining_ips = [ip for ip in existing_ips if ip != ip_address]
-        
-        if remaining_ips:
-            # Update with remaining IPs
-            records = [{"content": ip, "disabled": False} for ip in remaining_ips]
-            rrset_data = {
-                "rrsets": [
-                    {
-                        "name": fqdn,
-                        "type": "A",
-                        "changetype": "REPLACE",
-                        "records": records
-                    }
-                ]
-            }
-        else:
-            # Delete the entire record if no IPs remain
-            rrset_data = {
-                "rrsets": [
-                    {
-                        "name": fqdn,
-                        "type": "A",
-                        "changetype": "DELETE"
-                    }
-                ]
-            }
+        rrset_data = {"rrsets": [self._build_rrset(fqdn, remaining_ips)]}
         
         try:
-            response = self.session.patch(zone_endpoint, json=rrset_data, verify=False)
+            response = self._patch_zone(zone_endpoint, rrset_data)
             response.raise_for_status()
+            self._update_cached_rrset(domain, fqdn, remaining_ips)
             return True
             
         except requests.exceptions.RequestException as e:
@@ -344,52 +640,22 @@ class PowerDNSManager:
         # If no specific IP provided, remove all records
         if ip_address is None:
             logger.info(f"Removing all A records for {fqdn} (IPs: {', '.join(existing_ips)})")
-            rrset_data = {
-                "rrsets": [
-                    {
-                        "name": fqdn,
-                        "type": "A",
-                        "changetype": "DELETE"
-                    }
-                ]
-            }
+            remaining_ips = []
         else:
             # Remove specific IP
             if ip_address not in existing_ips:
                 logger.warning(f"Record {fqdn} -> {ip_address} does not exist")
                 return False
             
-            # Remove the IP from existing ones
+            # Remove the IP from existing ones; the rrset is deleted if no IPs remain
             remaining_ips = [ip for ip in existing_ips if ip != ip_address]
-            
-            if remaining_ips:
-                # Update with remaining IPs
-                records = [{"content": ip, "disabled": False} for ip in remaining_ips]
-                rrset_data = {
-                    "rrsets": [
-                        {
-                            "name": fqdn,
-                            "type": "A",
-                            "changetype": "REPLACE",
-                            "records": records
-                        }
-                    ]
-                }
-            else:
-                # Delete the entire record if no IPs remain
-                rrset_data = {
-                    "rrsets": [
-                        {
-                            "name": fqdn,
-                            "type": "A",
-                            "changetype": "DELETE"
-                        }
-                    ]
-                }
+        
+        rrset_data = {"rrsets": [self._build_rrset(fqdn, remaining_ips)]}
         
         try:
-            response = self.session.patch(zone_endpoint, json=rrset_data, verify=False)
+            response = self._patch_zone(zone_endpoint, rrset_data)
             response.raise_for_status()
+            self._update_cached_rrset(domain, fqdn, remaining_ips)
             
             if ip_address:
                 logger.info(f"Successfully removed A record: {fqdn} -> {ip_address}")
@@ -420,23 +686,20 @@ def parseCsvFile(file_path: str) -> List[Tuple[str, str]]:
         ValueError: If CSV file is invalid or cannot be read
     """
     # Parse using shared utility (MAC is validated but not used)
-    full_records = parse_mac_ip_csv(
+    full_records = iter_mac_ip_csv(
         file_path=file_path,
         mac_validator=None,  # We don't care about MAC validation for DNS
         ip_validator=validateIpAddress
     )
     
     # Convert FQDN to short hostname for DNS and extract only hostname & IP
-    records = []
-    for fqdn, _mac, ip_address in full_records:
-        short_hostname = fqdn.split('.', 1)[0]
-        records.append((short_hostname, ip_address))
+    records = [(fqdn.partition('.')[0], ip_address) for fqdn, _mac, ip_address in full_records]
     
     logger.info(f"Loaded {len(records)} record(s) from CSV file")
     return records
 
 
-def parseArguments() -> argparse.Namespace:
+def parseArguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
     """
     Parse command line arguments.
     
@@ -465,6 +728,9 @@ Examples:
     
   Run in non-interactive mode (skip prompts on conflicts):
     %(prog)s --domain example.com --file hosts.csv --action add --non-interactive
+    
+  Preview the changes for a CSV file without applying them:
+    %(prog)s --domain example.com --file hosts.csv --action add --dry-run
 
 CSV File Format (unified):
   The CSV file should contain FQDN hostname, MAC (ignored), and IP:
@@ -559,7 +825,13 @@ Environment Variables:
         help='Run in non-interactive mode (skip user prompts on conflicts)'
     )
     
-    return parser.parse_args()
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Report the changes that would be made without applying them (reads the zone once)'
+    )
+    
+    return parser.parse_args(argv)
 
 
 def validateIpAddress(ip_address: str) -> bool:
@@ -572,17 +844,18 @@ def validateIpAddress(ip_address: str) -> bool:
     Returns:
         True if valid, False otherwise
     """
-    parts = ip_address.split('.')
-    
-    if len(parts) != 4:
-        return False
-    
+    # inet_pton only accepts the strict dotted-quad form, unlike inet_aton
     try:
-        return all(0 <= int(part) <= 255 for part in parts)
-    except (ValueError, TypeError):
+        socket.inet_pton(socket.AF_INET, ip_address)
+        return True
+    except (OSError, ValueError, TypeError):
         return False
 
 
+_YES_ANSWERS = frozenset(('yes', 'y'))
+_NO_ANSWERS = frozenset(('no', 'n'))
+
+
 def getUserConfirmation(prompt: str) -> bool:
     """
     Prompt user for yes/no confirmation.
@@ -595,10 +868,16 @@ def getUserConfirmation(prompt: str) -> bool:
     """
     while True:
         try:
-            response = input(f"{prompt} (yes/no): ").strip().lower()
-            if response in ['yes', 'y']:
+            sys.stdout.write(f"{prompt} (yes/no): ")
+            sys.stdout.flush()
+            line = sys.stdin.readline()
+            if not line:
+                # End of input
+                raise EOFError
+            response = line.strip().lower()
+            if response in _YES_ANSWERS:
                 return True
-            elif response in ['no', 'n']:
+            elif response in _NO_ANSWERS:
                 return False
             else:
                 print("Please answer 'yes' or 'no'")
@@ -607,22 +886,31 @@ def getUserConfirmation(prompt: str) -> bool:
             return False
 
 
-def main() -> int:
+def main(argv: Optional[List[str]] = None, session: Optional[requests.Session] = None,
+         records: Optional[List[Tuple[str, Optional[str]]]] = None) -> int:
     """
     Main execution function.
     
+    Args:
+        argv: Command line arguments (default: sys.argv[1:])
+        session: Existing requests session to reuse for API calls (optional)
+        records: Already validated (short_hostname, ip) records; when given,
+            --file, --hostname and --ip are ignored
+    
     Returns:
         Exit code (0 for success, 1 for failure)
     """
-    args = parseArguments()
+    args = parseArguments(argv)
     
     # Configure logging level
     if args.debug:
         logger.setLevel(logging.DEBUG)
         logging.getLogger().setLevel(logging.DEBUG)
     
-    # Validate input: either file or hostname must be provided
-    if args.file:
+    # Validate input: records, file or hostname must be provided
+    if records is not None:
+        records = list(records)
+    elif args.file:
         if args.hostname or args.ip:
             logger.warning("Both --file and --hostname/--ip provided. Using --file, ignoring --hostname and --ip.")
         
@@ -675,14 +963,14 @@ def main() -> int:
     server_id = args.server_id or os.environ.get('POWERDNS_SERVER_ID', 'localhost')
     
     # Suppress SSL warnings for internal servers
-    import urllib3
     urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
     
     # Initialize PowerDNS manager
     pdns = PowerDNSManager(
         server_url=server_url,
         api_key=api_key,
-        server_id=server_id
+        server_id=server_id,
+        session=session
     )
     
     # Process records
@@ -694,35 +982,59 @@ def main() -> int:
     interactive_mode = not args.non_interactive
     
     logger.info(f"Processing {total_records} record(s)...")
-    if not interactive_mode:
+    if args.dry_run:
+        logger.info("Dry run - changes will be reported but not applied")
+    elif not interactive_mode:
         logger.info("Running in non-interactive mode - conflicts will be skipped")
     
-    for hostname, ip_address in records:
-        if ip_address:
-            logger.info(f"Processing: {hostname} -> {ip_address}")
-        else:
-            logger.info(f"Processing: {hostname} (all A records)")
-        
-        success = False
-        if args.action == 'add':
-            success = pdns.add_record(
+    # Close the connection pool when done, unless the session belongs to the caller
+    with contextlib.closing(pdns.session) if session is None else contextlib.nullcontext():
+        if args.dry_run:
+            # Resolve against the cached zone only; nothing is sent to the server
+            successful, failed = pdns.apply_batch(
                 domain=args.domain,
-                hostname=hostname,
-                ip_address=ip_address,
+                records=records,
+                action=args.action,
                 ttl=args.ttl,
-                interactive=interactive_mode
+                interactive=interactive_mode,
+                dry_run=True
             )
-        elif args.action == 'remove':
-            success = pdns.remove_record(
+        elif total_records > 1:
+            # Resolve everything against one zone fetch and send a single update
+            successful, failed = pdns.apply_batch(
                 domain=args.domain,
-                hostname=hostname,
-                ip_address=ip_address
+                records=records,
+                action=args.action,
+                ttl=args.ttl,
+                interactive=interactive_mode
             )
-        
-        if success:
-            successful += 1
         else:
-            failed += 1
+            for hostname, ip_address in records:
+                if ip_address:
+                    logger.info(f"Processing: {hostname} -> {ip_address}")
+                else:
+                    logger.info(f"Processing: {hostname} (all A records)")
+                
+                success = False
+                if args.action == 'add':
+                    success = pdns.add_record(
+                        domain=args.domain,
+                        hostname=hostname,
+                        ip_address=ip_address,
+                        ttl=args.ttl,
+                        interactive=interactive_mode
+                    )
+                elif args.action == 'remove':
+                    success = pdns.remove_record(
+                        domain=args.domain,
+                        hostname=hostname,
+                        ip_address=ip_address
+                    )
+                
+                if success:
+                    successful += 1
+                else:
+                    failed += 1
     
     # Summary
     logger.info(f"Summary: {successful} successful, {failed} failed out of {total_records} record(s)")
@@ -0,0 +1,74 @@
+"""Tests for dhcp_reservation_manager.py reservation parsing."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dhcp_reservation_manager as drm  # noqa: E402
+
+
+CONF = (
+    "host mac01.example.com {\n"
+    "  Hardware  Ethernet AA:BB:CC:DD:EE:01;\n"
+    "  FIXED-ADDRESS 10.0.0.1;\n"
+    "}\n"
+    "HOST mac02.example.com {\n"
+    "  hardware\tethernet aa:bb:cc:dd:ee:02;\n"
+    "  fixed-address 10.0.0.2;\n"
+    "}\n"
+)
+
+
+def test_extract_all_reservations_ignores_keyword_case_and_spacing():
+    assert drm.extract_all_reservations(CONF) == [
+        ('mac01.example.com', 'aa:bb:cc:dd:ee:01', '10.0.0.1'),
+        ('mac02.example.com', 'aa:bb:cc:dd:ee:02', '10.0.0.2'),
+    ]
+
+
+def test_scan_blocks_matches_on_str_and_bytes():
+    assert list(drm._scan_blocks(CONF)) == list(drm._scan_blocks(CONF.encode('ascii')))
+
+
+def test_find_reservation_by_mac_with_uppercase_keywords():
+    found = drm.find_reservation_by_mac(CONF, 'AA-BB-CC-DD-EE-01')
+    assert found == ('mac01.example.com', 'aa:bb:cc:dd:ee:01', '10.0.0.1')
+
+
+@pytest.fixture
+def cache_env(tmp_path, monkeypatch):
+    dhcpd = tmp_path / 'dhcpd'
+    dhcpd.write_text('#!/bin/sh\n')
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    monkeypatch.setattr(drm, '_find_dhcpd_binary', lambda: str(dhcpd))
+    return tmp_path, dhcpd
+
+
+def test_validation_cache_hit_until_config_changes(cache_env):
+    tmp_path, _dhcpd = cache_env
+    config = tmp_path / 'dhcpd.conf'
+    config.write_text(CONF)
+    drm.record_validation(str(config))
+    assert drm.is_validation_cached(str(config))
+    config.write_text(CONF + "# edited\n")
+    assert not drm.is_validation_cached(str(config))
+
+
+def test_validation_cache_invalidated_by_new_dhcpd(cache_env):
+    tmp_path, dhcpd = cache_env
+    config = tmp_path / 'dhcpd.conf'
+    config.write_text(CONF)
+    drm.record_validation(str(config))
+    dhcpd.write_text('#!/bin/sh\n# upgraded\n')
+    assert not drm.is_validation_cached(str(config))
+
+
+def test_validation_cache_skips_configs_with_includes(cache_env):
+    tmp_path, _dhcpd = cache_env
+    config = tmp_path / 'dhcpd.conf'
+    config.write_text('include "/etc/dhcp/hosts.conf";\n' + CONF)
+    drm.record_validation(str(config))
+    assert not drm.is_validation_cached(str(config))
@@ -0,0 +1,34 @@
+"""Tests for mac_inventory_collector.py remote output parsing."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mac_inventory_collector as mic  # noqa: E402
+
+
+IFCONFIG_OUTPUT = (
+    "mac01.example.com\n"
+    "en0: flags=8863<UP,BROADCAST,SMART,RUNNING,SIMPLEX,MULTICAST> mtu 1500\n"
+    "\toptions=50b<RXCSUM,TXCSUM,VLAN_HWTAGGING,AV,CHANNEL_IO>\n"
+    "\tether 00:11:22:AA:BB:CC\n"
+    "\tinet 10.0.0.21 netmask 0xffffff00 broadcast 10.0.0.255\n"
+)
+
+NETWORKSETUP_OUTPUT = (
+    "mac02.example.com\n"
+    "Ethernet Address: 00:11:22:DD:EE:FF (Device: en0)\n"
+)
+
+
+def test_parse_remote_info_ifconfig():
+    assert mic.parse_remote_info(IFCONFIG_OUTPUT) == ('mac01.example.com', '00:11:22:aa:bb:cc')
+
+
+def test_parse_remote_info_networksetup_drops_device_suffix():
+    assert mic.parse_remote_info(NETWORKSETUP_OUTPUT) == ('mac02.example.com', '00:11:22:dd:ee:ff')
+
+
+def test_parse_remote_info_without_mac():
+    assert mic.parse_remote_info("mac03.example.com\n") == ('mac03.example.com', '')
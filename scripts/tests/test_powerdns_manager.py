@@ -0,0 +1,114 @@
+"""Tests for powerdns_manager.py batch updates against a stubbed session."""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import powerdns_manager as pdm  # noqa: E402
+
+
+DOMAIN = 'example.com'
+
+
+class StubResponse:
+    def __init__(self, body=None):
+        self.content = json.dumps(body or {}).encode()
+    
+    def raise_for_status(self):
+        pass
+
+
+class StubSession:
+    """Serves one zone on GET and records the body of every PATCH."""
+    
+    def __init__(self, rrsets):
+        self.headers = {}
+        self.verify = True
+        self.zone = {'rrsets': rrsets}
+        self.patches = []
+    
+    def get(self, url, **kwargs):
+        return StubResponse(self.zone)
+    
+    def patch(self, url, data=None, **kwargs):
+        self.patches.append(json.loads(data))
+        return StubResponse()
+
+
+def a_rrset(name, *ips):
+    return {'name': name, 'type': 'A', 'records': [{'content': ip} for ip in ips]}
+
+
+@pytest.fixture
+def session():
+    return StubSession([
+        a_rrset('mac01.example.com.', '10.0.0.1'),
+        a_rrset('mac02.example.com.', '10.0.0.2', '10.0.0.3'),
+    ])
+
+
+def manager(session):
+    return pdm.PowerDNSManager('http://pdns.test', 'key', session=session)
+
+
+def test_add_replaces_rrset_with_all_ips(session):
+    assert manager(session).apply_batch(DOMAIN, [('mac01', '10.0.0.9')], 'add', ttl=600) == (1, 0)
+    assert session.patches == [{'rrsets': [{
+        'name': 'mac01.example.com.', 'type': 'A', 'changetype': 'REPLACE', 'ttl': 600,
+        'records': [{'content': '10.0.0.1', 'disabled': False},
+                    {'content': '10.0.0.9', 'disabled': False}],
+    }]}]
+
+
+def test_remove_all_records_deletes_rrset(session):
+    assert manager(session).apply_batch(DOMAIN, [('mac02', None)], 'remove') == (1, 0)
+    assert session.patches == [{'rrsets': [
+        {'name': 'mac02.example.com.', 'type': 'A', 'changetype': 'DELETE'},
+    ]}]
+
+
+def test_remove_one_ip_keeps_the_others(session):
+    assert manager(session).apply_batch(DOMAIN, [('mac02', '10.0.0.2')], 'remove') == (1, 0)
+    [rrset] = session.patches[0]['rrsets']
+    assert rrset['changetype'] == 'REPLACE'
+    assert [record['content'] for record in rrset['records']] == ['10.0.0.3']
+
+
+def test_ip_conflict_fails_without_patch_when_non_interactive(session):
+    result = manager(session).apply_batch(DOMAIN, [('mac03', '10.0.0.1')], 'add', interactive=False)
+    assert result == (0, 1)
+    assert session.patches == []
+
+
+def test_confirmed_ip_conflict_moves_ip_in_one_patch(session, monkeypatch):
+    monkeypatch.setattr(pdm, 'getUserConfirmation', lambda prompt: True)
+    assert manager(session).apply_batch(DOMAIN, [('mac03', '10.0.0.1')], 'add') == (1, 0)
+    [patch] = session.patches
+    assert [(rrset['name'], rrset['changetype']) for rrset in patch['rrsets']] == [
+        ('mac01.example.com.', 'DELETE'),
+        ('mac03.example.com.', 'REPLACE'),
+    ]
+
+
+def test_ip_freed_by_earlier_batch_is_not_a_conflict(session):
+    records = [('mac01', None), ('mac03', '10.0.0.1')]
+    pdns = manager(session)
+    assert pdns.apply_batch(DOMAIN, records[:1], 'remove') == (1, 0)
+    assert pdns.apply_batch(DOMAIN, records[1:], 'add', interactive=False) == (1, 0)
+
+
+def test_dry_run_sends_nothing(session):
+    records = [('mac01', '10.0.0.9'), ('mac03', '10.0.0.2'), ('mac04', '10.0.0.4')]
+    assert manager(session).apply_batch(DOMAIN, records, 'add', dry_run=True) == (3, 0)
+    assert session.patches == []
+
+
+def test_failed_patch_fails_changed_records_only(session, monkeypatch):
+    pdns = manager(session)
+    monkeypatch.setattr(pdns, 'bulk_apply', lambda domain, changes: False)
+    records = [('mac01', '10.0.0.1'), ('mac03', '10.0.0.7')]
+    assert pdns.apply_batch(DOMAIN, records, 'add') == (1, 1)
@@ -11,19 +11,30 @@ Usage:
     Production: gunicorn -w 4 -b 0.0.0.0:5000 app:app
 """
 
+import codecs
+import contextlib
+import csv
+import hmac
+import io
 import os
+import secrets
+import time
 import uuid
 import logging
-from functools import wraps
+import threading
+from functools import lru_cache, wraps
 from datetime import datetime
 
 from flask import (
-    Flask, render_template, request, redirect, 
-    url_for, flash, session, jsonify
+    Flask, Request, render_template, request, redirect, 
+    url_for, flash, session, jsonify, g
 )
 from flask_session import Session
+from jinja2 import FileSystemBytecodeCache
 from werkzeug.utils import secure_filename
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from config import get_config
 
@@ -34,16 +45,62 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Prefix of the files that uploads are spooled into before being moved into place
+UPLOAD_SPOOL_PREFIX = '.upload-'
+
+# Bytes read from the start of an upload to check that it is a CSV
+CSV_SNIFF_BYTES = 4096
+
+
+class _DiscardedUpload(io.BytesIO):
+    """Stream for uploads with a disallowed file name; their bytes are dropped."""
+    
+    def write(self, data):
+        return len(data)
+
+
+class UploadRequest(Request):
+    """Request that spools uploaded files directly into the upload folder.
+    
+    Werkzeug's default keeps small uploads in memory and spools large ones to
+    a temporary file elsewhere, so saving an upload copies it a second time.
+    Spooling into UPLOAD_FOLDER lets save_upload() move the file into place
+    with a rename instead. Files whose name fails allowed_file() are rejected
+    by the views anyway, so they are never written anywhere.
+    """
+    
+    def _get_file_stream(self, total_content_length, content_type,
+                         filename=None, content_length=None):
+        if not allowed_file(filename or ''):
+            return _DiscardedUpload()
+        
+        # Created like file.save() would, so the usual umask permissions apply
+        spool_name = f"{UPLOAD_SPOOL_PREFIX}{uuid.uuid4().hex}"
+        spool = open(os.path.join(app.config['UPLOAD_FOLDER'], spool_name), 'xb+')
+        # Remembered so remove_unsaved_uploads() never has to parse the form
+        g.setdefault('upload_spools', []).append(spool)
+        return spool
+
+
 # Initialize Flask app
 app = Flask(__name__)
 app.config.from_object(get_config())
+app.request_class = UploadRequest
 
 # Initialize server-side session
 Session(app)
 
-# Ensure upload directory exists
+# Compress HTML/JSON responses (optional)
+try:
+    from flask_compress import Compress
+    Compress(app)
+except ImportError:
+    logger.info("Flask-Compress not installed. Responses are sent uncompressed.")
+
+# Ensure upload and session directories exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-os.makedirs(app.config.get('SESSION_FILE_DIR', '/tmp/flask_session'), exist_ok=True)
+if app.config['SESSION_TYPE'] == 'filesystem':
+    os.makedirs(app.config.get('SESSION_FILE_DIR', '/tmp/flask_session'), exist_ok=True)
 
 # Azure AD MSAL (optional)
 msal_app = None
@@ -61,11 +118,116 @@ if app.config.get('AZURE_AD_ENABLED'):
     except Exception as e:
         logger.warning(f"Failed to initialize Azure AD: {e}")
 
+# Azure AD sign-in is usable only if it is enabled and the MSAL client was built
+AZURE_AD_READY = bool(app.config.get('AZURE_AD_ENABLED') and msal_app)
+
+
+# Normalized once so each upload check is a single set lookup
+app.config['ALLOWED_EXTENSIONS'] = frozenset(
+    ext.lower() for ext in app.config['ALLOWED_EXTENSIONS']
+)
+_ALLOWED_EXTENSIONS = app.config['ALLOWED_EXTENSIONS']
+
+# Shared Jenkins session: keeps connections alive across triggers instead of
+# opening a new TCP/TLS connection for every request
+jenkins_session = requests.Session()
+jenkins_session.auth = (app.config['JENKINS_USER'], app.config['JENKINS_TOKEN'])
+jenkins_session.verify = app.config['JENKINS_VERIFY_SSL']
+_jenkins_adapter = HTTPAdapter(
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 502, 503, 504],
+        # Status and read errors are retried for GETs only. A build trigger
+        # POST is retried only when it could not connect, since Jenkins may
+        # already have queued a build it failed to answer for.
+        allowed_methods=['GET'],
+        raise_on_status=False
+    )
+)
+jenkins_session.mount('http://', _jenkins_adapter)
+jenkins_session.mount('https://', _jenkins_adapter)
+
+# Connect timeout for Jenkins requests; read timeouts are set per call
+JENKINS_CONNECT_TIMEOUT = 3.05
+
+# Jenkins boolean build parameter values
+_BOOL = {True: 'true', False: 'false'}
+
 
 def allowed_file(filename):
     """Check if file extension is allowed."""
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
+    dot = filename.rfind('.')
+    return dot != -1 and filename[dot + 1:].lower() in _ALLOWED_EXTENSIONS
+
+
+def _spooled_path(file):
+    """Return the path of the upload folder file an upload was spooled to, if any."""
+    name = getattr(file.stream, 'name', None)
+    if isinstance(name, str) and os.path.basename(name).startswith(UPLOAD_SPOOL_PREFIX):
+        return name
+    return None
+
+
+def save_upload(file, filepath):
+    """Save an uploaded file, moving its spool file into place when possible."""
+    spooled = _spooled_path(file)
+    if spooled:
+        file.stream.flush()
+        os.replace(spooled, filepath)
+    else:
+        file.save(filepath)
+
+
+def looks_like_mac_csv(file):
+    """
+    Check that an upload starts with a hostname, mac, ip CSV row.
+    
+    Only the first CSV_SNIFF_BYTES are inspected, so malformed or binary
+    uploads are rejected without being saved or sent to Jenkins.
+    
+    Args:
+        file: Uploaded FileStorage
+        
+    Returns:
+        True if the first non-empty row has at least three columns
+    """
+    head = file.stream.read(CSV_SNIFF_BYTES)
+    file.stream.seek(0)
+    
+    try:
+        # Incremental decode tolerates a character cut off at the end of the block
+        text = codecs.getincrementaldecoder('utf-8-sig')().decode(head)
+    except UnicodeDecodeError:
+        return False
+    if '\0' in text:
+        return False
+    
+    for row in csv.reader(io.StringIO(text)):
+        if any(cell.strip() for cell in row):
+            return len(row) >= 3
+    return False
+
+
+@app.teardown_request
+def remove_unsaved_uploads(error=None):
+    """Delete spool files of uploads that were rejected or never saved."""
+    for spool in g.pop('upload_spools', ()):
+        spool.close()
+        # Saved uploads were renamed away from their spool path
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(spool.name)
+
+
+# ID token claims copied into session['user'] after sign-in
+SESSION_USER_CLAIMS = ('name', 'preferred_username', 'oid', 'tid')
+
+
+@lru_cache(maxsize=8)
+def azure_redirect_uri(url_root):
+    """Get the Azure AD redirect URI: AZURE_REDIRECT_URI, or the callback path on url_root."""
+    return app.config['AZURE_REDIRECT_URI'] or url_root.rstrip('/') + app.config['AZURE_REDIRECT_PATH']
 
 
 def login_required(f):
@@ -79,6 +241,17 @@ def login_required(f):
     return decorated_function
 
 
+def requires_azure(f):
+    """Decorator for Azure AD sign-in routes; redirects home when Azure AD is unavailable."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not AZURE_AD_READY:
+            flash('Azure AD authentication is not configured', 'warning')
+            return redirect(url_for('index'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+
 def trigger_jenkins_job(job_name, params=None):
     """
     Trigger a Jenkins job with optional parameters.
@@ -93,7 +266,6 @@ def trigger_jenkins_job(job_name, params=None):
     jenkins_url = app.config['JENKINS_URL'].rstrip('/')
     jenkins_user = app.config['JENKINS_USER']
     jenkins_token = app.config['JENKINS_TOKEN']
-    verify_ssl = app.config['JENKINS_VERIFY_SSL']
     
     if not jenkins_user or not jenkins_token:
         return False, "Jenkins credentials not configured", None
@@ -106,12 +278,10 @@ def trigger_jenkins_job(job_name, params=None):
             url = f"{jenkins_url}/job/{job_name}/build"
         
         # Make the request
-        response = requests.post(
+        response = jenkins_session.post(
             url,
-            auth=(jenkins_user, jenkins_token),
             params=params or {},
-            verify=verify_ssl,
-            timeout=30
+            timeout=(JENKINS_CONNECT_TIMEOUT, 30)
         )
         
         if response.status_code in [200, 201]:
@@ -130,33 +300,29 @@ def trigger_jenkins_job(job_name, params=None):
 # =============================================================================
 
 @app.route('/login')
+@requires_azure
 def login():
     """Initiate Azure AD login."""
-    if not app.config.get('AZURE_AD_ENABLED') or not msal_app:
-        flash('Azure AD authentication is not configured', 'warning')
-        return redirect(url_for('index'))
-    
     # Generate state for CSRF protection
-    session['state'] = str(uuid.uuid4())
+    session['state'] = secrets.token_urlsafe(16)
     
     # Get authorization URL
     auth_url = msal_app.get_authorization_request_url(
         scopes=app.config['AZURE_SCOPE'],
         state=session['state'],
-        redirect_uri=request.url_root.rstrip('/') + app.config['AZURE_REDIRECT_PATH']
+        redirect_uri=azure_redirect_uri(request.url_root)
     )
     
     return redirect(auth_url)
 
 
 @app.route('/auth/callback')
+@requires_azure
 def auth_callback():
     """Handle Azure AD callback."""
-    if not app.config.get('AZURE_AD_ENABLED') or not msal_app:
-        return redirect(url_for('index'))
-    
-    # Verify state
-    if request.args.get('state') != session.get('state'):
+    # Verify state; it is single-use, so it leaves the session here
+    expected_state = session.pop('state', None)
+    if not expected_state or not hmac.compare_digest(request.args.get('state', ''), expected_state):
         flash('Invalid state parameter', 'error')
         return redirect(url_for('index'))
     
@@ -165,13 +331,16 @@ def auth_callback():
         result = msal_app.acquire_token_by_authorization_code(
             request.args['code'],
             scopes=app.config['AZURE_SCOPE'],
-            redirect_uri=request.url_root.rstrip('/') + app.config['AZURE_REDIRECT_PATH']
+            redirect_uri=azure_redirect_uri(request.url_root)
         )
         
         if 'access_token' in result:
-            # Get user info
-            session['user'] = result.get('id_token_claims', {})
-            session['access_token'] = result['access_token']
+            # Keep only the claims the portal uses; the portal never calls Graph
+            claims = result.get('id_token_claims', {})
+            session['user'] = {key: claims[key] for key in SESSION_USER_CLAIMS if key in claims}
+            # MSAL also cached the tokens in msal_app; nothing reads them, so drop them
+            for account in msal_app.get_accounts(username=claims.get('preferred_username')):
+                msal_app.remove_account(account)
             flash(f"Welcome, {session['user'].get('name', 'User')}!", 'success')
         else:
             flash('Authentication failed', 'error')
@@ -200,10 +369,18 @@ def index():
                          default_domain=app.config['DEFAULT_DOMAIN'])
 
 
-@app.route('/add-mac', methods=['GET', 'POST'])
-@login_required
-def add_mac():
-    """Add Mac hosts form."""
+def handle_mac_csv_form(action, endpoint, template):
+    """
+    Handle the Add/Remove Mac forms: save the uploaded CSV and trigger the job.
+    
+    Args:
+        action: ACTION parameter passed to the Jenkins job ('add' or 'remove')
+        endpoint: Endpoint to redirect to after a job was triggered
+        template: Template rendering the form
+        
+    Returns:
+        Flask response
+    """
     if request.method == 'POST':
         # Handle file upload
         if 'csv_file' not in request.files:
@@ -216,11 +393,16 @@ def add_mac():
             return redirect(request.url)
         
         if file and allowed_file(file.filename):
+            if not looks_like_mac_csv(file):
+                flash('Invalid CSV file. Expected columns: hostname, mac, ip', 'error')
+                return redirect(request.url)
+            
             filename = secure_filename(file.filename)
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            unique_filename = f"{timestamp}_{filename}"
+            # Timestamp for operators, random token so concurrent uploads never collide
+            timestamp = time.strftime('%Y%m%d_%H%M%S')
+            unique_filename = f"{timestamp}_{secrets.token_hex(4)}_{filename}"
             filepath = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-            file.save(filepath)
+            save_upload(file, filepath)
             
             # Get form parameters
             domain = request.form.get('domain', app.config['DEFAULT_DOMAIN'])
@@ -228,10 +410,10 @@ def add_mac():
             
             # Trigger Jenkins job
             params = {
-                'ACTION': 'add',
+                'ACTION': action,
                 'CSV_FILE': filepath,
                 'DOMAIN': domain,
-                'DRY_RUN': str(dry_run).lower()
+                'DRY_RUN': _BOOL[dry_run]
             }
             
             success, message, build_url = trigger_jenkins_job(
@@ -244,64 +426,26 @@ def add_mac():
             else:
                 flash(f'Failed to trigger job: {message}', 'error')
             
-            return redirect(url_for('add_mac'))
+            return redirect(url_for(endpoint))
         else:
             flash('Invalid file type. Only CSV files are allowed.', 'error')
     
-    return render_template('add_mac.html',
+    return render_template(template,
                          default_domain=app.config['DEFAULT_DOMAIN'])
 
 
+@app.route('/add-mac', methods=['GET', 'POST'])
+@login_required
+def add_mac():
+    """Add Mac hosts form."""
+    return handle_mac_csv_form('add', 'add_mac', 'add_mac.html')
+
+
 @app.route('/remove-mac', methods=['GET', 'POST'])
 @login_required
 def remove_mac():
     """Remove Mac hosts form."""
-    if request.method == 'POST':
-        # Handle file upload
-        if 'csv_file' not in request.files:
-            flash('No file selected', 'error')
-            return redirect(request.url)
-        
-        file = request.files['csv_file']
-        if file.filename == '':
-            flash('No file selected', 'error')
-            return redirect(request.url)
-        
-        if file and allowed_file(file.filename):
-            filename = secure_filename(file.filename)
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            unique_filename = f"{timestamp}_{filename}"
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-            file.save(filepath)
-            
-            # Get form parameters
-            domain = request.form.get('domain', app.config['DEFAULT_DOMAIN'])
-            dry_run = 'dry_run' in request.form
-            
-            # Trigger Jenkins job
-            params = {
-                'ACTION': 'remove',
-                'CSV_FILE': filepath,
-                'DOMAIN': domain,
-                'DRY_RUN': str(dry_run).lower()
-            }
-            
-            success, message, build_url = trigger_jenkins_job(
-                app.config['JENKINS_JOB_ADD_REMOVE'],
-                params
-            )
-            
-            if success:
-                flash(f'Job triggered successfully! {message}', 'success')
-            else:
-                flash(f'Failed to trigger job: {message}', 'error')
-            
-            return redirect(url_for('remove_mac'))
-        else:
-            flash('Invalid file type. Only CSV files are allowed.', 'error')
-    
-    return render_template('remove_mac.html',
-                         default_domain=app.config['DEFAULT_DOMAIN'])
+    return handle_mac_csv_form('remove', 'remove_mac', 'remove_mac.html')
 
 
 @app.route('/configure', methods=['GET', 'POST'])
@@ -320,7 +464,7 @@ def configure():
         params = {
             'TARGET': target,
             'TAGS': tags,
-            'CHECK_MODE': str(check_mode).lower()
+            'CHECK_MODE': _BOOL[check_mode]
         }
         
         success, message, build_url = trigger_jenkins_job(
@@ -352,7 +496,7 @@ def install_xcode():
         
         params = {
             'TARGET': target,
-            'FORCE_REINSTALL': str(force).lower()
+            'FORCE_REINSTALL': _BOOL[force]
         }
         
         success, message, build_url = trigger_jenkins_job(
@@ -374,37 +518,89 @@ def install_xcode():
 # API Endpoints
 # =============================================================================
 
+# Serialized health response, rebuilt at most once per second
+_health_cache = {'expires': 0.0, 'body': None}
+
+
 @app.route('/api/health')
 def health_check():
     """Health check endpoint."""
-    return jsonify({
-        'status': 'healthy',
-        'app': app.config['APP_NAME'],
-        'version': app.config['APP_VERSION'],
-        'timestamp': datetime.utcnow().isoformat()
-    })
+    now = time.monotonic()
+    if now >= _health_cache['expires']:
+        _health_cache['body'] = app.json.dumps({
+            'status': 'healthy',
+            'app': app.config['APP_NAME'],
+            'version': app.config['APP_VERSION'],
+            'timestamp': datetime.utcnow().isoformat()
+        })
+        _health_cache['expires'] = now + 1
+    
+    response = app.response_class(_health_cache['body'], mimetype='application/json')
+    response.cache_control.max_age = 1
+    return response
 
 
-@app.route('/api/jenkins/status')
-@login_required
-def jenkins_status():
-    """Check Jenkins connectivity."""
+# Seconds a Jenkins status probe is reused before Jenkins is asked again
+JENKINS_STATUS_TTL = 15
+_jenkins_status_cache = {'expires': 0.0, 'result': None, 'probing': False}
+# Guards the cache only; never held while Jenkins is being probed
+_jenkins_status_lock = threading.Lock()
+
+
+def _probe_jenkins():
+    """Query Jenkins for its version; returns (payload, http_status)."""
     try:
-        response = requests.get(
+        response = jenkins_session.get(
             f"{app.config['JENKINS_URL']}/api/json",
-            auth=(app.config['JENKINS_USER'], app.config['JENKINS_TOKEN']),
-            verify=app.config['JENKINS_VERIFY_SSL'],
-            timeout=10
+            timeout=(JENKINS_CONNECT_TIMEOUT, 10)
         )
-        return jsonify({
+        return {
             'status': 'connected',
             'jenkins_version': response.headers.get('X-Jenkins', 'unknown')
-        })
+        }, 200
     except Exception as e:
-        return jsonify({
+        return {
             'status': 'error',
             'message': str(e)
-        }), 500
+        }, 500
+
+
+@app.route('/api/jenkins/status')
+@login_required
+def jenkins_status():
+    """Check Jenkins connectivity."""
+    # Polls within the TTL reuse the last probe. Once it expires, one poll
+    # probes Jenkins while the others keep answering with the last result
+    with _jenkins_status_lock:
+        result = _jenkins_status_cache['result']
+        probe = (time.monotonic() >= _jenkins_status_cache['expires']
+                 and not _jenkins_status_cache['probing'])
+        if probe:
+            _jenkins_status_cache['probing'] = True
+    
+    if probe:
+        try:
+            result = _probe_jenkins()
+            with _jenkins_status_lock:
+                _jenkins_status_cache['result'] = result
+                _jenkins_status_cache['expires'] = time.monotonic() + JENKINS_STATUS_TTL
+        finally:
+            with _jenkins_status_lock:
+                _jenkins_status_cache['probing'] = False
+    elif result is None:
+        # Nothing cached yet while the first probe is still running
+        result = _probe_jenkins()
+    payload, status_code = result
+    
+    response = jsonify(payload)
+    response.status_code = status_code
+    response.cache_control.private = True
+    response.cache_control.max_age = JENKINS_STATUS_TTL
+    if status_code == 200:
+        # Lets clients revalidate an unchanged status with a 304
+        response.add_etag()
+        response = response.make_conditional(request)
+    return response
 
 
 # =============================================================================
@@ -431,18 +627,42 @@ def internal_error(error):
 # Template Context
 # =============================================================================
 
+# Template globals that do not change while the app is running
+_static_globals = {
+    'app_name': app.config['APP_NAME'],
+    'app_version': app.config['APP_VERSION'],
+    'azure_ad_enabled': app.config.get('AZURE_AD_ENABLED', False)
+}
+_year_cache = {'expires': 0.0, 'year': None}
+
+
+def _current_year():
+    """Current year, rechecked at most once an hour."""
+    now = time.monotonic()
+    if now >= _year_cache['expires']:
+        _year_cache['year'] = datetime.now().year
+        _year_cache['expires'] = now + 3600
+    return _year_cache['year']
+
+
 @app.context_processor
 def inject_globals():
     """Inject global variables into templates."""
     return {
-        'app_name': app.config['APP_NAME'],
-        'app_version': app.config['APP_VERSION'],
-        'current_year': datetime.now().year,
-        'user': session.get('user'),
-        'azure_ad_enabled': app.config.get('AZURE_AD_ENABLED', False)
+        **_static_globals,
+        'current_year': _current_year(),
+        'user': session.get('user')
     }
 
 
+# Compile templates at startup instead of on each worker's first requests;
+# the bytecode cache (in Jinja's private per-user directory, created 0700 and
+# checked for ownership) lets other workers load them without recompiling
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
+for template_name in app.jinja_env.list_templates(extensions=['html']):
+    app.jinja_env.get_template(template_name)
+
+
 # =============================================================================
 # Main Entry Point
 # =============================================================================
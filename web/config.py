@@ -16,8 +16,15 @@ class Config:
     SECRET_KEY = os.environ.get('FLASK_SECRET_KEY', 'change-this-in-production')
     
     # Session Configuration
-    SESSION_TYPE = 'filesystem'
-    SESSION_FILE_DIR = '/tmp/flask_session'
+    # Sessions live in Redis when REDIS_URL is set, otherwise on local disk
+    REDIS_URL = os.environ.get('REDIS_URL', '')
+    if REDIS_URL:
+        import redis
+        SESSION_TYPE = 'redis'
+        SESSION_REDIS = redis.from_url(REDIS_URL)
+    else:
+        SESSION_TYPE = 'filesystem'
+        SESSION_FILE_DIR = '/tmp/flask_session'
     SESSION_PERMANENT = True
     PERMANENT_SESSION_LIFETIME = timedelta(hours=8)
     SESSION_USE_SIGNER = True
@@ -28,6 +35,12 @@ class Config:
     ALLOWED_EXTENSIONS = {'csv', 'txt'}
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     
+    # Response compression (used when Flask-Compress is installed)
+    COMPRESS_ALGORITHM = ['br', 'gzip']
+    COMPRESS_MIMETYPES = ['text/html', 'text/css', 'application/javascript', 'application/json']
+    COMPRESS_LEVEL = 6
+    COMPRESS_BR_LEVEL = 4
+    
     # Azure AD Configuration (for SSO)
     # Set these environment variables for Azure AD authentication
     AZURE_AD_ENABLED = os.environ.get('AZURE_AD_ENABLED', 'false').lower() == 'true'
@@ -36,6 +49,8 @@ class Config:
     AZURE_TENANT_ID = os.environ.get('AZURE_TENANT_ID', '')
     AZURE_AUTHORITY = f"https://login.microsoftonline.com/{AZURE_TENANT_ID}"
     AZURE_REDIRECT_PATH = '/auth/callback'
+    # Absolute redirect URI; defaults to AZURE_REDIRECT_PATH on the request's host
+    AZURE_REDIRECT_URI = os.environ.get('AZURE_REDIRECT_URI', '')
     AZURE_SCOPE = ['User.Read']
     
     # Jenkins Configuration